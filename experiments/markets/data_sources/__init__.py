@@ -14,16 +14,25 @@ All data is unified into a consistent format for Hamiltonian analysis.
 __version__ = "1.0.0"
 __author__ = "Universal Hamiltonian Framework"
 
-from .mt5_connector import MT5DataCollector
-from .deriv_connector import DerivDataCollector
-from .tradingview_connector import TradingViewDataCollector
-from .alpaca_connector import AlpacaDataCollector
-from .unified_pipeline import UnifiedDataPipeline
-
-__all__ = [
-    'MT5DataCollector',
-    'DerivDataCollector',
-    'TradingViewDataCollector',
-    'AlpacaDataCollector',
-    'UnifiedDataPipeline'
-]
+import importlib
+
+# Connectors are imported on first access so a missing client library
+# (MetaTrader5, websockets, tradingview_ta, alpaca-py) only raises
+# ImportError for the connector that needs it.
+_EXPORTS = {
+    'MT5DataCollector': '.mt5_connector',
+    'DerivDataCollector': '.deriv_connector',
+    'TradingViewDataCollector': '.tradingview_connector',
+    'AlpacaDataCollector': '.alpaca_connector',
+    'UnifiedDataPipeline': '.unified_pipeline',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,37 @@
+"""
+Numba AOT build for the hamiltonian_optimized hot kernels
+
+Pre-compiles the per-tick energy kernel into a regular extension module
+(`quantum_trading.hamiltonian_aot`, written next to this file) so a fresh
+process never pays JIT compile latency on its first event loop iteration.
+
+Usage:
+    python aot_build.py
+    # or, together with the Cython extension:
+    python setup.py build_ext --inplace
+
+hamiltonian_optimized imports `.hamiltonian_aot` when it is present
+and falls back to the JIT (or NumPy) kernels otherwise.
+"""
+
+from pathlib import Path
+
+from numba.pycc import CC
+
+cc = CC('hamiltonian_aot')
+cc.output_dir = str(Path(__file__).parent)
+
+
+@cc.export('total_energy', 'f8[:](f8[:], f8[:], f8[:], f8, f8, f8, f8[:])')
+def total_energy(S, p, sigma, k, eq, drift, out):
+    """H = 0.5*(σSp)² + 0.5*k*(S-S_eq)² + drift*S*p (fused, one pass)"""
+    for i in range(S.size):
+        sp = S[i] * p[i]
+        dev = S[i] - eq
+        out[i] = 0.5 * sigma[i] * sigma[i] * sp * sp + 0.5 * k * dev * dev + drift * sp
+    return out
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"✅ Built {cc.name} in {cc.output_dir}")
@@ -17,9 +17,10 @@ from typing import Dict, List
 from datetime import datetime
 import time
 
-from ..hamiltonian.engine import HamiltonianEngine, MarketState
+from ..hamiltonian.engine import HamiltonianEngine, MARKET_DTYPE, MarketStateTable
 from ..quantum.wavefunction import QuantumDecisionLayer, TradingAction
 from ..optimization.qubo import QUBOOptimizer, Portfolio
+from ..hamiltonian_optimized import HamiltonianEngineOptimized
 
 # Import Phase 2 data connectors
 try:
@@ -47,7 +48,8 @@ class TradingSystem:
         self,
         universe: List[str] = None,
         capital: float = 10000.0,
-        mode: str = 'simulation'
+        mode: str = 'simulation',
+        verbose: bool = True
     ):
         """
         Initialize trading system
@@ -56,16 +58,25 @@ class TradingSystem:
             universe: List of symbols to trade
             capital: Total capital
             mode: 'simulation' or 'live'
+            verbose: Print a summary every iteration (disable for backtests)
         """
         self.universe = universe or ['SPY']
         self.capital = capital
         self.mode = mode
+        self.verbose = verbose
         
         # Initialize components
         self.hamiltonian_engine = HamiltonianEngine()
+        self.hamiltonian_engine_opt = HamiltonianEngineOptimized(
+            self.hamiltonian_engine.theta, specialize=True
+        )
         self.quantum_layer = QuantumDecisionLayer()
         self.optimizer = QUBOOptimizer(self.universe)
         
+        # Warm up JIT kernels so the first tick doesn't pay compile time
+        self.hamiltonian_engine_opt.batch_energies_optimized(np.zeros(1), np.zeros(1), np.ones(1))
+        self.optimizer._sa_kernel_warmup()
+        
         # Data pipeline (if available)
         if DATA_AVAILABLE and mode == 'live':
             self.data_pipeline = UnifiedDataPipeline()
@@ -74,44 +85,62 @@ class TradingSystem:
             self.data_pipeline = None
             self.data_collector = None
         
-        # State
-        self.market_states = {}
-        self.current_portfolio = Portfolio(positions={}, energy=0.0, timestamp=0.0)
+        # State: one MARKET_DTYPE row per symbol (index = universe order);
+        # market_states is the symbol → MarketState view over it
+        self.market = np.zeros(len(self.universe), dtype=MARKET_DTYPE)
+        self.market_states = MarketStateTable(self.universe, self.market)
+        self._symbol_index = {symbol: i for i, symbol in enumerate(self.universe)}
+        self._prev_shares = np.zeros(len(self.universe))
+        self._cur_shares = np.zeros(len(self.universe))
+        self.current_portfolio = Portfolio(positions={}, energy=0.0, timestamp=0)
         self.running = False
         
         # Logging
         self.log = []
+        
+        # Fixed CSV layout, built once: explicit columns + schema let Polars
+        # skip inference and regex column selection on every save_log
+        self._log_energy_columns = [f'{symbol}_energy' for symbol in self.universe]
+        self._log_price_columns = [f'{symbol}_price' for symbol in self.universe]
+        self._log_schema = {
+            'timestamp': pl.Datetime('ns'),
+            'action': pl.Utf8,
+            'pnl': pl.Float64,
+            'portfolio_value': pl.Float64,
+            **{col: pl.Float64 for col in self._log_energy_columns},
+            **{col: pl.Float64 for col in self._log_price_columns},
+        }
     
     def initialize_market_states(self):
         """Initialize or update market states from data"""
         
         if self.mode == 'simulation':
-            # Simulation: generate random states
-            for symbol in self.universe:
-                self.market_states[symbol] = MarketState(
-                    S=100.0 + np.random.randn() * 10,
-                    p=np.random.randn() * 0.1,
-                    sigma=0.20,
-                    spread=0.01,
-                    volume=1e6,
-                    timestamp=time.time()
-                )
+            # Simulation: generate random states (whole universe at once)
+            n = len(self.universe)
+            self.market['S'] = 100.0 + np.random.randn(n) * 10
+            self.market['p'] = np.random.randn(n) * 0.1
+            self.market['sigma'] = 0.20
+            self.market['spread'] = 0.01
+            self.market['volume'] = 1e6
+            self.market['ts'] = time.time_ns()
+            self.market_states.present[:] = True
         
         elif self.mode == 'live' and DATA_AVAILABLE:
             # Live: get from real data
-            for symbol in self.universe:
+            for i, symbol in enumerate(self.universe):
                 try:
                     quote = self.data_collector.get_latest_quote(symbol)
                     
                     if quote:
-                        self.market_states[symbol] = MarketState(
-                            S=(quote['bid_price'] + quote['ask_price']) / 2,
-                            p=0.0,  # Calculate from tick-to-tick
-                            sigma=0.20,  # Estimate from recent volatility
-                            spread=quote['spread'],
-                            volume=quote['bid_size'] + quote['ask_size'],
-                            timestamp=quote['timestamp'].timestamp()
+                        self.market[i] = (
+                            (quote['bid_price'] + quote['ask_price']) / 2,  # S
+                            0.0,  # p: calculate from tick-to-tick
+                            0.20,  # sigma: estimate from recent volatility
+                            quote['spread'],
+                            quote['bid_size'] + quote['ask_size'],
+                            int(quote['timestamp'].timestamp() * 1e9)
                         )
+                        self.market_states.present[i] = True
                 except Exception as e:
                     print(f"⚠️  Could not get data for {symbol}: {e}")
         
@@ -135,16 +164,21 @@ class TradingSystem:
         # 1. UPDATE MARKET STATES
         self.initialize_market_states()
         
-        # 2. CALCULATE HAMILTONIAN
-        energies = {}
-        for symbol, state in self.market_states.items():
-            energies[symbol] = self.hamiltonian_engine.total_energy(state)
+        # 2. CALCULATE HAMILTONIAN (one batch call over the universe)
+        batch = self.hamiltonian_engine_opt.batch_energies_optimized(
+            self.market['S'], self.market['p'], self.market['sigma']
+        )
+        energies = {
+            symbol: float(batch[i])
+            for symbol, i in self._symbol_index.items()
+            if symbol in self.market_states
+        }
         
         # 3. UPDATE QUANTUM LAYER
         # Use first symbol's state for single-asset decision
         # (Multi-asset would use entangled state)
-        primary_symbol = self.universe[0]
-        primary_state = self.market_states[primary_symbol]
+        # The primary energy comes straight from the batch above
+        primary = self._symbol_index[self.universe[0]]
         
         trading_costs = {
             'LONG': 0.01,    # 1 cent per share
@@ -153,10 +187,10 @@ class TradingSystem:
             'HEDGE': 0.02
         }
         
-        self.quantum_layer.variational_update(
-            self.hamiltonian_engine,
-            primary_state,
-            trading_costs
+        self.quantum_layer.variational_update_batch(
+            np.full(self.quantum_layer.n_actions, batch[primary]),
+            trading_costs,
+            int(self.market['ts'][primary]) / 1e9  # seconds, as MarketState.timestamp
         )
         
         # 4. OPTIMIZE PORTFOLIO (QUBO)
@@ -176,7 +210,7 @@ class TradingSystem:
         
         # 7. LOG
         log_entry = {
-            'timestamp': time.time(),
+            'timestamp': time.time_ns(),
             'market_states': self.market_states.copy(),
             'energies': energies,
             'quantum_probs': self.quantum_layer.probabilities().copy(),
@@ -192,22 +226,22 @@ class TradingSystem:
         """Simulate order execution"""
         
         # Calculate PnL from current vs new portfolio
-        current_value = sum(
-            shares * self.market_states[sym].S
-            for sym, shares in self.current_portfolio.positions.items()
-            if sym in self.market_states
-        )
+        # (shares vectors · price vector; _prev_shares holds current_portfolio)
+        for sym, shares in portfolio.positions.items():
+            idx = self._symbol_index.get(sym)
+            if idx is not None:
+                self._cur_shares[idx] = shares
         
-        new_value = sum(
-            shares * self.market_states[sym].S
-            for sym, shares in portfolio.positions.items()
-            if sym in self.market_states
-        )
+        prices = self.market['S']
+        current_value = float(self._prev_shares @ prices)
+        new_value = float(self._cur_shares @ prices)
         
         pnl = new_value - current_value
         
-        # Update current portfolio
+        # Update current portfolio (swap share buffers, reuse the old one)
         self.current_portfolio = portfolio
+        self._prev_shares, self._cur_shares = self._cur_shares, self._prev_shares
+        self._cur_shares.fill(0.0)
         
         return {
             'action': action.value,
@@ -241,13 +275,12 @@ class TradingSystem:
             if not self.running:
                 break
             
-            print(f"[Iteration {i+1}/{iterations}]")
-            
             try:
                 log_entry = self.event_loop_iteration()
                 
                 # Display results
-                self._print_iteration_summary(log_entry)
+                if self.verbose:
+                    self._print_iteration_summary(log_entry, i, iterations)
                 
             except Exception as e:
                 print(f"❌ Error: {e}")
@@ -263,43 +296,45 @@ class TradingSystem:
         
         self._print_final_summary()
     
-    def _print_iteration_summary(self, log_entry: Dict):
-        """Print summary of single iteration"""
+    def _print_iteration_summary(self, log_entry: Dict, i: int, iterations: int):
+        """Print summary of single iteration (one buffered write)"""
+        
+        lines = [f"[Iteration {i+1}/{iterations}]"]
         
         # Show energies
-        print(f"  Hamiltonian energies:")
+        lines.append("  Hamiltonian energies:")
         for symbol, energy in log_entry['energies'].items():
             state = log_entry['market_states'][symbol]
-            print(f"    {symbol}: ${state.S:.2f}, E={energy:.6f}")
+            lines.append(f"    {symbol}: ${state.S:.2f}, E={energy:.6f}")
         
         # Show quantum state
-        print(f"  Quantum layer:")
+        lines.append("  Quantum layer:")
         probs = log_entry['quantum_probs']
         actions = list(TradingAction)
         for action, prob in zip(actions, probs):
             marker = "→" if action.value == log_entry['action'] else " "
-            print(f"    {marker} {action.value}: {prob:.3f}")
+            lines.append(f"    {marker} {action.value}: {prob:.3f}")
         
         # Show action taken
-        print(f"  ✓ Measured: {log_entry['action']}")
+        lines.append(f"  ✓ Measured: {log_entry['action']}")
         
         # Show portfolio
         portfolio = log_entry['portfolio']
         if portfolio.positions:
-            print(f"  Portfolio:")
+            lines.append("  Portfolio:")
             for symbol, shares in portfolio.positions.items():
                 price = log_entry['market_states'][symbol].S
                 value = shares * price
-                print(f"    {symbol}: {shares:.2f} shares @ ${price:.2f} = ${value:.2f}")
+                lines.append(f"    {symbol}: {shares:.2f} shares @ ${price:.2f} = ${value:.2f}")
         else:
-            print(f"  Portfolio: FLAT (no positions)")
+            lines.append("  Portfolio: FLAT (no positions)")
         
         # Show PnL
         pnl = log_entry['execution']['pnl']
         current_value = log_entry['execution']['current_value']
-        print(f"  PnL: ${pnl:+.2f}, Total value: ${current_value:.2f}")
+        lines.append(f"  PnL: ${pnl:+.2f}, Total value: ${current_value:.2f}")
         
-        print()
+        sys.stdout.write("\n".join(lines) + "\n\n")
     
     def _print_final_summary(self):
         """Print summary of all iterations"""
@@ -348,41 +383,29 @@ class TradingSystem:
         if not self.log:
             return
         
-        # Flatten log for CSV (stay in superposition - use dict)
-        rows = []
-        for entry in self.log:
-            row = {
-                'timestamp': entry['timestamp'],
-                'action': entry['action'],
-                'pnl': entry['execution']['pnl'],
-                'portfolio_value': entry['execution']['current_value']
-            }
-            
-            # Add energies
-            for symbol, energy in entry['energies'].items():
-                row[f'{symbol}_energy'] = energy
-                row[f'{symbol}_price'] = entry['market_states'][symbol].S
-            
-            rows.append(row)
+        # Flatten log column-wise (stay in superposition - one list per column)
+        columns = {
+            'timestamp': [entry['timestamp'] for entry in self.log],
+            'action': [entry['action'] for entry in self.log],
+            'pnl': [entry['execution']['pnl'] for entry in self.log],
+            'portfolio_value': [entry['execution']['current_value'] for entry in self.log],
+        }
         
-        # Quantum collapse: Create lazy frame → optimize → write
-        # This is lazy execution = superposition until write!
+        for symbol, energy_col, price_col in zip(
+            self.universe, self._log_energy_columns, self._log_price_columns
+        ):
+            columns[energy_col] = [entry['energies'].get(symbol) for entry in self.log]
+            columns[price_col] = [
+                entry['market_states'][symbol].S if symbol in entry['market_states'] else None
+                for entry in self.log
+            ]
+        
+        # Quantum collapse: Create lazy frame → write
+        # Schema is fixed up front, so no inference pass is needed
         (
-            pl.LazyFrame(rows)
-            .select([  # Define schema in superposition
-                pl.col('timestamp'),
-                pl.col('action'),
-                pl.col('pnl'),
-                pl.col('portfolio_value'),
-                pl.col('^.*_energy$'),  # All energy columns
-                pl.col('^.*_price$')    # All price columns
-            ])
-            .collect()  # ← Wavefunction collapse!
-            .write_csv(filename)
+            pl.LazyFrame(columns, schema=self._log_schema)
+            .sink_csv(filename)  # ← Wavefunction collapse!
         )
-        
-        # Alternative eager mode (if lazy not needed):
-        # pl.DataFrame(rows).write_csv(filename)
     
     def stop(self):
         """Stop event loop"""
@@ -8,7 +8,8 @@ This is where mathematics meets market reality.
 """
 
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, Tuple, List
+from collections.abc import Mapping
 from dataclasses import dataclass
 
 
@@ -20,13 +21,62 @@ class MarketState:
     sigma: float  # Volatility
     spread: float  # Bid-ask spread
     volume: float  # Trading volume
-    timestamp: float  # Time
+    timestamp: float  # Time (epoch seconds)
     
     def to_vector(self):
         """Convert to numpy array for calculations"""
         return np.array([self.S, self.p, self.sigma, self.spread, self.volume])
 
 
+# One MarketState per row: 48 contiguous bytes instead of a Python object
+MARKET_DTYPE = np.dtype([
+    ('S', 'f8'),
+    ('p', 'f8'),
+    ('sigma', 'f8'),
+    ('spread', 'f8'),
+    ('volume', 'f8'),
+    ('ts', 'i8'),  # epoch nanoseconds (time.time_ns)
+])
+
+
+class MarketStateTable(Mapping):
+    """
+    Read-only symbol → MarketState mapping over a MARKET_DTYPE array
+    
+    Vectorized code reads columns directly (table.data['S']); the mapping
+    interface builds MarketState objects on access for existing callers.
+    """
+    
+    def __init__(self, universe: List[str], data: np.ndarray, present: np.ndarray = None):
+        self.universe = universe
+        self.data = data
+        self.present = np.zeros(len(universe), dtype=bool) if present is None else present
+        self._index = {symbol: i for i, symbol in enumerate(universe)}
+    
+    def __getitem__(self, symbol: str) -> MarketState:
+        i = self._index[symbol]
+        if not self.present[i]:
+            raise KeyError(symbol)
+        S, p, sigma, spread, volume, ts = self.data[i].tolist()
+        # Rows store epoch nanoseconds; MarketState.timestamp is in seconds
+        return MarketState(S=S, p=p, sigma=sigma, spread=spread, volume=volume,
+                           timestamp=ts / 1e9)
+    
+    def __contains__(self, symbol) -> bool:
+        i = self._index.get(symbol)
+        return i is not None and bool(self.present[i])
+    
+    def __iter__(self):
+        return (symbol for symbol, ok in zip(self.universe, self.present) if ok)
+    
+    def __len__(self) -> int:
+        return int(self.present.sum())
+    
+    def copy(self) -> 'MarketStateTable':
+        """Snapshot: one array copy, no per-symbol objects"""
+        return MarketStateTable(self.universe, self.data.copy(), self.present.copy())
+
+
 class HamiltonianEngine:
     """
     Market Hamiltonian: H = T(p) + V(S)
@@ -9,6 +9,8 @@ import numpy as np
 from typing import Dict, List, Tuple
 from dataclasses import dataclass
 
+from ..hamiltonian_optimized import QUBOSolverOptimized
+
 
 @dataclass
 class Portfolio:
@@ -162,46 +164,21 @@ class QUBOOptimizer:
         
         Temperature-based search allows tunneling out of local minima,
         analogous to quantum tunneling.
-        """
-        n = len(Q)
-        
-        # Random initial state
-        x = np.random.randint(0, 2, n)
-        
-        # Calculate initial energy
-        E_current = x.T @ Q @ x
-        E_best = E_current
-        x_best = x.copy()
-        
-        # Annealing schedule
-        T = T_init
-        
-        while T > T_final:
-            for _ in range(steps_per_temp):
-                # Propose single bit flip
-                i = np.random.randint(n)
-                x_new = x.copy()
-                x_new[i] = 1 - x_new[i]
-                
-                # Calculate new energy
-                E_new = x_new.T @ Q @ x_new
-                delta_E = E_new - E_current
-                
-                # Metropolis criterion
-                # Accept if lower energy OR probabilistically if higher
-                if delta_E < 0 or np.random.rand() < np.exp(-delta_E / T):
-                    x = x_new
-                    E_current = E_new
-                    
-                    # Track best
-                    if E_current < E_best:
-                        E_best = E_current
-                        x_best = x.copy()
-            
-            # Cool down
-            T *= cooling_rate
         
-        return x_best, E_best
+        Runs on QUBOSolverOptimized (incremental ΔE, compiled with
+        Numba when available).
+        """
+        solver = QUBOSolverOptimized(
+            T_init=T_init,
+            T_final=T_final,
+            cooling_rate=cooling_rate,
+            steps_per_temp=steps_per_temp
+        )
+        return solver.solve_qubo_optimized(Q)
+    
+    def _sa_kernel_warmup(self):
+        """Compile (or load from cache) the annealing kernel before the first tick"""
+        QUBOSolverOptimized()._sa_kernel_warmup()
     
     def _greedy_solve(self, Q: np.ndarray) -> Tuple[np.ndarray, float]:
         """Simple greedy solver (fast, suboptimal)"""
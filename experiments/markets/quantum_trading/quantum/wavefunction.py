@@ -116,40 +116,39 @@ class QuantumDecisionLayer:
             market_state: Current market state
             trading_costs: Cost per action (spread, commissions, impact)
         """
+        # Estimated energy after each action
+        # (Simplified: just use current state energy, so compute it once)
+        E = hamiltonian_engine.total_energy(market_state)
+        action_energies = np.full(self.n_actions, E)
+        
+        self.variational_update_batch(action_energies, trading_costs, market_state.timestamp)
+    
+    def variational_update_batch(self, action_energies: np.ndarray, trading_costs: Dict,
+                                 timestamp: float):
+        """
+        variational_update with all energies supplied as one vector
+        
+        The objective becomes one dot product per BFGS evaluation,
+        probs · (E + costs), instead of a Python loop calling the
+        Hamiltonian once per action.
+        
+        Args:
+            action_energies: Estimated energy after each action (n_actions,)
+            trading_costs: Cost per action (spread, commissions, impact)
+            timestamp: Time of the market data the energies came from
+        """
+        costs = np.array([trading_costs.get(action.value, 0.0) for action in self.actions])
+        action_values = np.asarray(action_energies, dtype=np.float64) + costs
         
         def objective(angles):
             """Expected energy + trading costs"""
-            # Build trial unitary
-            U = self.construct_unitary(angles)
-            
-            # Apply to current wavefunction
-            psi_trial = U @ self.psi
+            # Build trial unitary, apply to current wavefunction
+            psi_trial = self.construct_unitary(angles) @ self.psi
             
             # Calculate probabilities
             probs = np.abs(psi_trial)**2
             
-            # Expected energy
-            E_expected = 0.0
-            for i, action in enumerate(self.actions):
-                prob = probs[i]
-                
-                # Simulate taking this action
-                # (In real system, this would update position and evolve)
-                position_change = self._action_to_position_change(action)
-                
-                # Estimated energy after action
-                # (Simplified: just use current state energy)
-                E = hamiltonian_engine.total_energy(market_state)
-                
-                E_expected += prob * E
-            
-            # Add trading costs
-            cost_expected = sum(
-                probs[i] * trading_costs.get(action.value, 0.0)
-                for i, action in enumerate(self.actions)
-            )
-            
-            return E_expected + cost_expected
+            return float(probs @ action_values)
         
         # Number of parameters for U
         n_params = self.n_actions * (self.n_actions - 1) // 2
@@ -172,7 +171,7 @@ class QuantumDecisionLayer:
         
         # Record
         self.history.append({
-            'timestamp': market_state.timestamp,
+            'timestamp': timestamp,
             'probabilities': self.probabilities().copy(),
             'energy': result.fun
         })
@@ -3,6 +3,8 @@ Setup script for Cython compilation
 
 Compiles .pyx files to C extensions for maximum performance.
 
+Also builds the Numba AOT kernels (aot_build.py) when numba is installed.
+
 Usage:
     python setup.py build_ext --inplace
 """
@@ -21,6 +23,13 @@ extensions = [
     )
 ]
 
+# Numba AOT kernels for hamiltonian_optimized (optional)
+try:
+    from aot_build import cc as aot_cc
+    aot_extensions = [aot_cc.distutils_extension()]
+except ImportError:
+    aot_extensions = []
+
 setup(
     name="QuantumTradingFast",
     ext_modules=cythonize(
@@ -32,6 +41,6 @@ setup(
             'cdivision': True,
             'nonecheck': False,
         }
-    ),
+    ) + aot_extensions,
     include_dirs=[np.get_include()],
 )
@@ -10,6 +10,20 @@ from matplotlib.widgets import Slider, Button, RadioButtons
 from matplotlib.animation import FuncAnimation
 import sys
 import os
+import threading
+import time
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the demo still runs without numba"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 # Setup
 plt.style.use('dark_background')
@@ -26,6 +40,32 @@ ax_energy = plt.subplot(2, 2, 4)
 # Adjust for controls
 plt.subplots_adjust(left=0.1, bottom=0.35, right=0.95, top=0.93, hspace=0.3, wspace=0.3)
 
+# =============================================================================
+# Integrator Kernel
+# =============================================================================
+
+@njit(cache=True, fastmath=True)
+def _verlet_batch(q0, p0, dt, k, mass, n):
+    """Advance n symplectic Verlet steps, returning q, p and H after each step"""
+    q_out = np.empty(n)
+    p_out = np.empty(n)
+    E_out = np.empty(n)
+    q = q0
+    p = p0
+    F = -k * q  # carried across steps: kick-drift-kick needs one force per step
+    for i in range(n):
+        p_half = p + 0.5 * dt * F
+        q = q + dt * p_half / mass
+        F = -k * q
+        p = p_half + 0.5 * dt * F
+        q_out[i] = q
+        p_out[i] = p
+        E_out[i] = 0.5 * p * p / mass + 0.5 * k * q * q
+    return q_out, p_out, E_out
+
+# Absorb JIT compile latency before the first animation frame
+_verlet_batch(1.0, 0.0, 0.01, 1.0, 1.0, 1)
+
 # =============================================================================
 # System Parameters (adjustable via sliders)
 # =============================================================================
@@ -46,10 +86,58 @@ class HamiltonianSystem:
         self.q = self.q0
         self.p = self.p0
         self.t = 0.0
-        self.trajectory_q = [self.q]
-        self.trajectory_p = [self.p]
-        self.trajectory_t = [self.t]
-        self.trajectory_E = [self.hamiltonian(self.q, self.p)]
+        
+        # Trajectory ring buffers (SoA), written at _idx % max_points and
+        # mirrored max_points further on, so any window of the ring is one
+        # contiguous slice
+        self._q = np.empty(2 * self.max_points, dtype=np.float64)
+        self._p = np.empty(2 * self.max_points, dtype=np.float64)
+        self._t = np.empty(2 * self.max_points, dtype=np.float64)
+        self._E = np.empty(2 * self.max_points, dtype=np.float64)
+        self._idx = 0
+        self._filled = 0
+        
+        # Running (min, max) of q, p, E over the ring
+        self._lo = np.full(3, np.inf)
+        self._hi = np.full(3, -np.inf)
+        self._record(np.array([self.q]), np.array([self.p]), np.array([self.t]),
+                     np.array([self.hamiltonian(self.q, self.p)]))
+    
+    def _record(self, q, p, t, E):
+        """Write samples into the ring, overwriting the oldest ones"""
+        n = min(len(q), self.max_points)
+        slots = (self._idx + np.arange(n)) % self.max_points
+        tracked = ((self._q, q[-n:]), (self._p, p[-n:]), (self._E, E[-n:]))
+        evicted = [buf[slots[slots < self._filled]] for buf, _ in tracked]
+        
+        mirror = slots + self.max_points
+        for buf, new in tracked:
+            buf[slots] = new
+            buf[mirror] = new
+        self._t[slots] = t[-n:]
+        self._t[mirror] = t[-n:]
+        self._idx += n
+        self._filled = min(self._filled + n, self.max_points)
+        
+        # Extend bounds in O(n); rescan the ring only if an extreme rotated out
+        for j, (buf, new) in enumerate(tracked):
+            old = evicted[j]
+            if old.size and (old.min() <= self._lo[j] or old.max() >= self._hi[j]):
+                filled = buf[:self._filled]
+                self._lo[j], self._hi[j] = filled.min(), filled.max()
+            else:
+                self._lo[j] = min(self._lo[j], new.min())
+                self._hi[j] = max(self._hi[j], new.max())
+    
+    def bounds(self):
+        """Running (min, max) of q, p and E over the stored trajectory"""
+        return tuple(zip(self._lo, self._hi))
+    
+    def view(self):
+        """Trajectory (q, p, t, E) in chronological order, as zero-copy views"""
+        start = (self._idx - self._filled) % self.max_points
+        window = slice(start, start + self._filled)
+        return self._q[window], self._p[window], self._t[window], self._E[window]
     
     def hamiltonian(self, q, p):
         """H = p²/(2m) + ½kq²"""
@@ -59,32 +147,22 @@ class HamiltonianSystem:
         """F = -∂V/∂q = -kq"""
         return -self.k * q
     
-    def step(self):
-        """Symplectic Verlet integration step"""
-        # Half-step momentum
-        p_half = self.p + 0.5 * self.dt * self.force(self.q)
-        
-        # Full-step position
-        self.q = self.q + self.dt * p_half / self.mass
+    def step_many(self, n):
+        """Advance n symplectic Verlet steps in one compiled call"""
+        q_new, p_new, E_new = _verlet_batch(self.q, self.p, self.dt,
+                                            self.k, self.mass, n)
+        t_new = self.t + self.dt * np.arange(1, n + 1)
         
-        # Half-step momentum
-        self.p = p_half + 0.5 * self.dt * self.force(self.q)
+        self.q = float(q_new[-1])
+        self.p = float(p_new[-1])
+        self.t = float(t_new[-1])
         
-        # Update time
-        self.t += self.dt
-        
-        # Store trajectory
-        self.trajectory_q.append(self.q)
-        self.trajectory_p.append(self.p)
-        self.trajectory_t.append(self.t)
-        self.trajectory_E.append(self.hamiltonian(self.q, self.p))
-        
-        # Keep only recent history
-        if len(self.trajectory_q) > self.max_points:
-            self.trajectory_q.pop(0)
-            self.trajectory_p.pop(0)
-            self.trajectory_t.pop(0)
-            self.trajectory_E.pop(0)
+        # Store trajectory (ring keeps only recent history)
+        self._record(q_new, p_new, t_new, E_new)
+    
+    def step(self):
+        """Symplectic Verlet integration step"""
+        self.step_many(1)
 
 # Create system
 system = HamiltonianSystem()
@@ -127,12 +205,35 @@ btn_play = Button(ax_play, 'Pause', color='#4ecdc4', hovercolor='#6eddcc')
 
 is_playing = True
 
+# Physics runs on a background thread; this lock guards the system state
+# and ring buffers against the UI callbacks
+physics_lock = threading.Lock()
+stop_event = threading.Event()
+
+# Integration steps per wall-clock second (dt = 0.01 → simulated time runs 1:1)
+PHYSICS_HZ = 100
+
+def _physics_worker():
+    """Advance the system at PHYSICS_HZ, independent of the render cadence"""
+    period = 1.0 / PHYSICS_HZ
+    last = time.monotonic()
+    while not stop_event.wait(period):
+        due = int((time.monotonic() - last) * PHYSICS_HZ)
+        if due == 0:
+            continue
+        last += due / PHYSICS_HZ
+        if is_playing:
+            with physics_lock:
+                system.step_many(min(due, system.max_points))
+
 def update_params(val):
     """Update system parameters from sliders"""
-    system.mass = slider_mass.val
-    system.k = slider_k.val
-    system.q0 = slider_q0.val
-    system.p0 = slider_p0.val
+    with physics_lock:
+        system.mass = slider_mass.val
+        system.k = slider_k.val
+        system.q0 = slider_q0.val
+        system.p0 = slider_p0.val
+        fit_axes()
 
 # Connect sliders
 slider_mass.on_changed(update_params)
@@ -142,8 +243,10 @@ slider_p0.on_changed(update_params)
 
 def reset(event):
     """Reset simulation"""
-    system.reset()
-    update_plots()
+    with physics_lock:
+        system.reset()
+        fit_axes()
+        update_plots()
 
 def toggle_play(event):
     """Toggle play/pause"""
@@ -166,73 +269,102 @@ line_q, = ax_time_q.plot([], [], color='#ff6b6b', linewidth=2)
 line_p, = ax_time_p.plot([], [], color='#4ecdc4', linewidth=2)
 line_E, = ax_energy.plot([], [], color='#ffd93d', linewidth=2)
 
-# Configure axes
-ax_phase.set_xlabel('Position q', fontsize=12)
-ax_phase.set_ylabel('Momentum p', fontsize=12)
-ax_phase.set_title('Phase Portrait', fontsize=14, fontweight='bold')
-ax_phase.grid(True, alpha=0.3)
-ax_phase.set_xlim(-5, 5)
-ax_phase.set_ylim(-5, 5)
-ax_phase.set_aspect('equal')
-
-ax_time_q.set_xlabel('Time', fontsize=12)
-ax_time_q.set_ylabel('Position q(t)', fontsize=12)
-ax_time_q.set_title('Position Evolution', fontsize=14, fontweight='bold')
-ax_time_q.grid(True, alpha=0.3)
-
-ax_time_p.set_xlabel('Time', fontsize=12)
-ax_time_p.set_ylabel('Momentum p(t)', fontsize=12)
-ax_time_p.set_title('Momentum Evolution', fontsize=14, fontweight='bold')
-ax_time_p.grid(True, alpha=0.3)
-
-ax_energy.set_xlabel('Time', fontsize=12)
-ax_energy.set_ylabel('Energy H(q,p)', fontsize=12)
-ax_energy.set_title('Energy Conservation', fontsize=14, fontweight='bold')
-ax_energy.grid(True, alpha=0.3)
+def _setup_axes():
+    """
+    Static axis decoration (labels, titles, grids, phase-plot aspect).
+    
+    Called once at startup; per-frame code only touches Line2D data and
+    fit_axes() only touches the time-plot limits.
+    """
+    ax_phase.set_xlabel('Position q', fontsize=12)
+    ax_phase.set_ylabel('Momentum p', fontsize=12)
+    ax_phase.set_title('Phase Portrait', fontsize=14, fontweight='bold')
+    ax_phase.grid(True, alpha=0.3)
+    ax_phase.set_xlim(-5, 5)
+    ax_phase.set_ylim(-5, 5)
+    ax_phase.set_aspect('equal')
+    
+    ax_time_q.set_xlabel('Time', fontsize=12)
+    ax_time_q.set_ylabel('Position q(t)', fontsize=12)
+    ax_time_q.set_title('Position Evolution', fontsize=14, fontweight='bold')
+    ax_time_q.grid(True, alpha=0.3)
+    
+    ax_time_p.set_xlabel('Time', fontsize=12)
+    ax_time_p.set_ylabel('Momentum p(t)', fontsize=12)
+    ax_time_p.set_title('Momentum Evolution', fontsize=14, fontweight='bold')
+    ax_time_p.grid(True, alpha=0.3)
+    
+    ax_energy.set_xlabel('Time', fontsize=12)
+    ax_energy.set_ylabel('Energy H(q,p)', fontsize=12)
+    ax_energy.set_title('Energy Conservation', fontsize=14, fontweight='bold')
+    ax_energy.grid(True, alpha=0.3)
+
+_setup_axes()
+
+# Headroom on the time axis, as a fraction of the stored history span
+TIME_HEADROOM = 0.2
+
+def fit_axes():
+    """
+    Set time-plot limits from the orbit's analytic bounds, then redraw once.
+    
+    For the oscillator the orbit through (q, p) is an ellipse with
+    |q| <= A = sqrt(q² + p²/(km)) and |p| <= A·sqrt(km), and H is
+    constant, so the limits only change with the parameters or when
+    the time window scrolls. Keeping them fixed in between lets
+    blitting redraw only the line artists. The stored history is
+    included so samples from before a slider change stay in view.
+    """
+    q, p = system.q, system.p
+    km = system.k * system.mass
+    (q_min, q_max), (p_min, p_max), (E_min, E_max) = system.bounds()
+    q_amp = max(np.sqrt(q**2 + p**2 / km), -q_min, q_max)
+    p_amp = max(q_amp * np.sqrt(km), -p_min, p_max)
+    E = system.hamiltonian(q, p)
+    E_pad = max(0.02, 0.01 * E)
+    E_lo, E_hi = min(E - E_pad, E_min), max(E + E_pad, E_max)
+    
+    span = system.max_points * system.dt
+    t_start = max(0.0, system.t - span)
+    
+    for ax in (ax_time_q, ax_time_p, ax_energy):
+        ax.set_xlim(t_start, t_start + (1 + TIME_HEADROOM) * span)
+    ax_time_q.set_ylim(-q_amp - 0.5, q_amp + 0.5)
+    ax_time_p.set_ylim(-p_amp - 0.5, p_amp + 0.5)
+    ax_energy.set_ylim(E_lo, E_hi)
+    
+    # Full synchronous draw so the blit background picks up the new ticks
+    fig.canvas.draw()
 
 def update_plots():
     """Update all plots with current trajectory"""
-    if len(system.trajectory_q) < 2:
+    q_arr, p_arr, t_arr, E_arr = system.view()
+    if len(q_arr) < 2:
         return
     
     # Phase portrait
-    line_phase.set_data(system.trajectory_q, system.trajectory_p)
+    line_phase.set_data(q_arr, p_arr)
     point_current.set_data([system.q], [system.p])
     
     # Time evolution
-    line_q.set_data(system.trajectory_t, system.trajectory_q)
-    line_p.set_data(system.trajectory_t, system.trajectory_p)
-    line_E.set_data(system.trajectory_t, system.trajectory_E)
+    line_q.set_data(t_arr, q_arr)
+    line_p.set_data(t_arr, p_arr)
+    line_E.set_data(t_arr, E_arr)
     
-    # Auto-scale time plots
-    if len(system.trajectory_t) > 1:
-        t_min, t_max = min(system.trajectory_t), max(system.trajectory_t)
-        dt_range = max(0.1, t_max - t_min)
-        
-        ax_time_q.set_xlim(t_min - 0.1*dt_range, t_max + 0.1*dt_range)
-        ax_time_p.set_xlim(t_min - 0.1*dt_range, t_max + 0.1*dt_range)
-        ax_energy.set_xlim(t_min - 0.1*dt_range, t_max + 0.1*dt_range)
-        
-        q_arr = np.array(system.trajectory_q)
-        p_arr = np.array(system.trajectory_p)
-        E_arr = np.array(system.trajectory_E)
-        
-        ax_time_q.set_ylim(q_arr.min() - 0.5, q_arr.max() + 0.5)
-        ax_time_p.set_ylim(p_arr.min() - 0.5, p_arr.max() + 0.5)
-        
-        E_mean = E_arr.mean()
-        E_range = max(0.01, E_arr.max() - E_arr.min())
-        ax_energy.set_ylim(E_mean - 2*E_range, E_mean + 2*E_range)
+    # Refit only when the window scrolls or the data leaves the fixed limits
+    (q_min, q_max), (p_min, p_max), (E_min, E_max) = system.bounds()
+    q_lim, p_lim, E_lim = (ax.get_ylim() for ax in (ax_time_q, ax_time_p, ax_energy))
+    if (t_arr[-1] > ax_time_q.get_xlim()[1]
+            or q_min < q_lim[0] or q_max > q_lim[1]
+            or p_min < p_lim[0] or p_max > p_lim[1]
+            or E_min < E_lim[0] or E_max > E_lim[1]):
+        fit_axes()
 
 def animate(frame):
-    """Animation function"""
+    """Animation function (render only; the physics thread evolves the system)"""
     if is_playing:
-        # Evolve system
-        for _ in range(5):  # 5 steps per frame for speed
-            system.step()
-        
-        # Update plots
-        update_plots()
+        with physics_lock:
+            update_plots()
     
     return line_phase, point_current, line_q, line_p, line_E
 
@@ -260,8 +392,14 @@ print("="*70)
 print()
 
 # Create animation
+fit_axes()
 ani = FuncAnimation(fig, animate, interval=50, blit=True, cache_frame_data=False)
 
+physics_thread = threading.Thread(target=_physics_worker, daemon=True)
+physics_thread.start()
+fig.canvas.mpl_connect('close_event', lambda event: stop_event.set())
+
 plt.show()
+stop_event.set()
 
 print("\nVisualization closed.")
@@ -3,9 +3,20 @@ Quick Demo - Universal Hamiltonian Framework
 Standalone version that doesn't require module imports
 """
 
+from functools import cache
+
 import numpy as np
 import sympy as sp
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in so the demo still runs without numba"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 print("\n")
 print("████████████████████████████████████████████████████████████")
 print("█                                                          █")
@@ -25,20 +36,32 @@ print("="*60)
 def hamiltonian(q, p):
     return 0.5 * p**2 + 0.5 * q**2
 
-def force(q):
-    return -q  # F = -dV/dq = -q
-
-# Symplectic Verlet integrator
-def verlet_step(q, p, dt):
+# Symplectic Verlet integrator (F = -dV/dq = -q)
+@njit(cache=True, fastmath=True)
+def verlet_trajectory(q0, p0, dt, n):
     """
     Symplectic integration preserving phase-space structure.
     
-    Half-step momentum, full-step position, half-step momentum
+    Half-step momentum, full-step position, half-step momentum.
+    Returns an (n + 1, 2) array of (q, p) rows, initial state included,
+    and the energy H = p²/2 + q²/2 at each row (computed in the same pass).
     """
-    p_half = p + 0.5 * dt * force(q)
-    q_new = q + dt * p_half
-    p_new = p_half + 0.5 * dt * force(q_new)
-    return q_new, p_new
+    traj = np.empty((n + 1, 2))
+    E = np.empty(n + 1)
+    traj[0, 0] = q0
+    traj[0, 1] = p0
+    E[0] = 0.5 * p0 * p0 + 0.5 * q0 * q0
+    q, p = q0, p0
+    F = -q0  # force at the end of one step is reused at the start of the next
+    for i in range(n):
+        p_half = p + 0.5 * dt * F
+        q = q + dt * p_half
+        F = -q
+        p = p_half + 0.5 * dt * F
+        traj[i + 1, 0] = q
+        traj[i + 1, 1] = p
+        E[i + 1] = 0.5 * p * p + 0.5 * q * q
+    return traj, E
 
 # Initial conditions
 q0, p0 = 1.0, 0.0
@@ -49,17 +72,13 @@ print(f"\nInitial state: q={q0:.3f}, p={p0:.3f}")
 print(f"Initial energy: H={hamiltonian(q0, p0):.6f}")
 
 # Evolve
-q, p = q0, p0
-trajectory = [(q, p)]
-
-for _ in range(n_steps):
-    q, p = verlet_step(q, p, dt)
-    trajectory.append((q, p))
+traj, E_traj = verlet_trajectory(q0, p0, dt, n_steps)
+q, p = traj[-1]
 
-final_E = hamiltonian(q, p)
+final_E = E_traj[-1]
 print(f"\nFinal state: q={q:.3f}, p={p:.3f}")
 print(f"Final energy: H={final_E:.6f}")
-print(f"Energy drift: ΔE/E₀ = {abs(final_E - hamiltonian(q0, p0))/hamiltonian(q0, p0):.2e}")
+print(f"Energy drift: ΔE/E₀ = {abs(final_E - E_traj[0])/E_traj[0]:.2e}")
 
 print("\n✓ Energy conserved (symplectic integration)!")
 
@@ -83,8 +102,14 @@ print(f"\nHamilton's Equations (auto-derived):")
 print(f"  dq/dt = ∂H/∂p = {dq_dt}")
 print(f"  dp/dt = -∂H/∂q = {dp_dt}")
 
+# Lambdify once; later evaluations run NumPy instead of walking the expression tree
+dq_dt_f = sp.lambdify((q_sym, p_sym), dq_dt, 'numpy')
+dp_dt_f = sp.lambdify((q_sym, p_sym), dp_dt, 'numpy')
+
 # Poisson bracket {q, p} should equal 1
+@cache
 def poisson_bracket(f, g, q, p):
+    """{f, g} = ∂f/∂q ∂g/∂p - ∂f/∂p ∂g/∂q (memoized on the hashable expressions)"""
     return sp.diff(f, q) * sp.diff(g, p) - sp.diff(f, p) * sp.diff(g, q)
 
 pb_qp = poisson_bracket(q_sym, p_sym, q_sym, p_sym)
@@ -125,10 +150,23 @@ def coupled_hamiltonian(q1, q2, p1, p2):
     V_coupling = 0.5 * k_coupling * (q1 - q2)**2
     return T + V_individual + V_coupling
 
-def coupled_forces(q1, q2):
-    f1 = -q1 - k_coupling * (q1 - q2)
-    f2 = -q2 - k_coupling * (q2 - q1)
-    return f1, f2
+@njit(cache=True, fastmath=True)
+def evolve_coupled(q1, q2, p1, p2, dt, k, n):
+    """Verlet for the coupled system, forces inlined; returns the final state"""
+    f1 = -q1 - k * (q1 - q2)
+    f2 = -q2 - k * (q2 - q1)
+    for _ in range(n):
+        p1_half = p1 + 0.5 * dt * f1
+        p2_half = p2 + 0.5 * dt * f2
+        
+        q1 += dt * p1_half
+        q2 += dt * p2_half
+        
+        f1 = -q1 - k * (q1 - q2)
+        f2 = -q2 - k * (q2 - q1)
+        p1 = p1_half + 0.5 * dt * f1
+        p2 = p2_half + 0.5 * dt * f2
+    return q1, q2, p1, p2
 
 # Initial: oscillator 1 displaced, oscillator 2 at rest
 q1, q2 = 1.0, 0.0
@@ -138,18 +176,7 @@ print(f"\nInitial: q1={q1:.2f}, q2={q2:.2f}")
 print(f"Coupling strength: k={k_coupling}")
 
 # Evolve
-for _ in range(500):
-    # Verlet for coupled system
-    f1, f2 = coupled_forces(q1, q2)
-    p1_half = p1 + 0.5 * dt * f1
-    p2_half = p2 + 0.5 * dt * f2
-    
-    q1 += dt * p1_half
-    q2 += dt * p2_half
-    
-    f1, f2 = coupled_forces(q1, q2)
-    p1 = p1_half + 0.5 * dt * f1
-    p2 = p2_half + 0.5 * dt * f2
+q1, q2, p1, p2 = evolve_coupled(q1, q2, p1, p2, dt, k_coupling, 500)
 
 print(f"After evolution: q1={q1:.2f}, q2={q2:.2f}")
 print("\n✓ Energy transferred between coupled oscillators!")
@@ -164,9 +191,9 @@ print("  • Space translation → Momentum")
 print("  • Rotation → Angular momentum")
 
 # For harmonic oscillator, energy is conserved
-E_trajectory = [hamiltonian(q, p) for q, p in trajectory[::100]]  # Every 100th point
-E_mean = np.mean(E_trajectory)
-E_std = np.std(E_trajectory)
+E_trajectory = E_traj[::100]  # Every 100th point
+E_mean = E_trajectory.mean()
+E_std = E_trajectory.std()
 
 print(f"\nEnergy statistics over trajectory:")
 print(f"  Mean: {E_mean:.6f}")
@@ -1,15 +1,16 @@
 import sys
 sys.path.insert(0, 'src')
 from domains.market_dynamics import MarketHamiltonian, MarketState
+import numpy as np
 
 def run_test():
     H1 = MarketHamiltonian(liquidity_mass=1.0, volatility=0.0, mean_reversion_strength=0.5, equilibrium_price=100.0)
     s = MarketState(price=110.0, momentum=0.0)
-    for i in range(1, 501):
-        s = H1.evolve_tick(s, dt=0.01)
-        if i <= 20 or i % 100 == 0:
-            print(i, s.price, s.momentum)
-    print('final', s.price, s.momentum)
+    q_hist, p_hist = H1.evolve_n(s.price, s.momentum, dt=0.01, n=500)
+    # ticks 1..20, then every 100th
+    for i in np.r_[1:21, 100:501:100]:
+        print(i, q_hist[i - 1], p_hist[i - 1])
+    print('final', q_hist[-1], p_hist[-1])
 
 if __name__ == '__main__':
     run_test()
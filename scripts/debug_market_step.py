@@ -6,16 +6,14 @@ import numpy as np
 H = MarketHamiltonian(liquidity_mass=1.0, volatility=0.0, mean_reversion_strength=0.5, damping=0.5, equilibrium_price=100.0)
 s = MarketState(price=110.0, momentum=0.0)
 print('init', s.price, s.momentum)
-for i in range(1, 11):
-    q, p = s.price, s.momentum
-    F = H.force(q)
-    p_half = p + 0.5 * 0.01 * F
-    noise = 0.0
-    p_half_noisy = p_half + noise
-    q_new = q + 0.01 * p_half_noisy / H.lambda_liq
-    F_new = H.force(q_new)
-    p_new = p_half_noisy + 0.5 * 0.01 * F_new
-    gamma = H.damping
-    p_new = p_new * (1.0 - gamma * 0.01)
-    s = MarketState(price=q_new, momentum=p_new)
-    print(i, 'q', q_new, 'p_half', p_half, 'p_new', p_new, 'F', F, 'F_new', F_new)
+dt = 0.01
+q_hist, p_hist = H.evolve_n(s.price, s.momentum, dt=dt, n=10)
+
+# Reconstruct the per-step intermediates from the batched history (noise = 0)
+q_prev = np.r_[s.price, q_hist[:-1]]
+p_prev = np.r_[s.momentum, p_hist[:-1]]
+F = H.force(q_prev)
+p_half = p_prev + 0.5 * dt * F
+F_new = H.force(q_hist)
+for i in range(10):
+    print(i + 1, 'q', q_hist[i], 'p_half', p_half[i], 'p_new', p_hist[i], 'F', F[i], 'F_new', F_new[i])
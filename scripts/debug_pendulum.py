@@ -17,10 +17,8 @@ system = Pendulum()
 initial = PhaseSpace(q=np.array([0.1]), p=np.array([0.0]))
 t, q_traj, p_traj = system.evolve(initial, t_max=10.0, dt=0.01)
 
-crossings = []
-for i in range(1, len(q_traj)):
-    if q_traj[i-1, 0] * q_traj[i, 0] < 0:
-        crossings.append(t[i])
+theta = q_traj[:, 0]
+crossings = t[1:][theta[:-1] * theta[1:] < 0.0]
 
 print('len crossings', len(crossings))
 print('crossings[:6]', crossings[:6])
@@ -1,20 +1,66 @@
+import os
+import platform
+import subprocess
+import sys
+import sysconfig
+
 from setuptools import setup, Extension
 from Cython.Build import cythonize
 import numpy as np
 
+
+def _cc_accepts(flag):
+    """True if the configured C compiler accepts `flag`"""
+    cc = (os.environ.get("CC") or sysconfig.get_config_var("CC") or "cc").split()
+    try:
+        result = subprocess.run(
+            cc + [flag, "-x", "c", "-c", "-o", os.devnull, "-"],
+            input=b"int main(void) { return 0; }\n",
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return False
+    return result.returncode == 0
+
+
+def _compile_args():
+    """
+    Portable optimization flags.
+
+    x86-64-v3 (AVX2 + FMA) instead of -march=native, so wheels run on any
+    machine of the last decade rather than only on the build host. The
+    fast-math family lets the compiler vectorize reductions and libm calls.
+    UHF_MARCH overrides the -march value (e.g. UHF_MARCH=native).
+    """
+    if sys.platform == "win32":
+        return ["/O2", "/arch:AVX2", "/fp:fast"]
+
+    args = ["-O3", "-ffast-math", "-fno-math-errno"]
+    march = os.environ.get("UHF_MARCH")
+    if march is None and platform.machine().lower() in ("x86_64", "amd64"):
+        march = "x86-64-v3"
+    if march and _cc_accepts(f"-march={march}"):
+        args.append(f"-march={march}")
+    if _cc_accepts("-fopenmp-simd"):
+        args.append("-fopenmp-simd")
+    return args
+
+
+COMPILE_ARGS = _compile_args()
+
 # Cython extensions for performance-critical numerical code
 extensions = [
     Extension(
         "uvh.core.canonical_transforms",
         ["src/core/canonical_transforms.pyx"],
         include_dirs=[np.get_include()],
-        extra_compile_args=["/O2"] if hasattr(__builtins__, '_is_windows') else ["-O3", "-march=native"],
+        extra_compile_args=COMPILE_ARGS,
     ),
     Extension(
         "uvh.domains.classical_mechanics",
         ["src/domains/classical_mechanics.pyx"],
         include_dirs=[np.get_include()],
-        extra_compile_args=["/O2"] if hasattr(__builtins__, '_is_windows') else ["-O3", "-march=native"],
+        extra_compile_args=COMPILE_ARGS,
     ),
 ]
 
@@ -16,12 +16,25 @@ Date: November 26, 2025
 
 import jax
 import jax.numpy as jnp
-from jax import jit, grad, vmap
+from jax import jit, vmap
 from jax.scipy.linalg import expm
+from jax.scipy.special import xlogy
 from functools import partial
-from typing import Callable, Tuple
+from typing import Callable, NamedTuple, Tuple
 import numpy as np
 
+try:
+    import optax
+    OPTAX_AVAILABLE = True
+except ImportError:
+    OPTAX_AVAILABLE = False
+
+try:
+    import diffrax
+    DIFFRAX_AVAILABLE = True
+except ImportError:
+    DIFFRAX_AVAILABLE = False
+
 # Enable 64-bit precision for physics
 jax.config.update("jax_enable_x64", True)
 
@@ -29,132 +42,352 @@ jax.config.update("jax_enable_x64", True)
 # KRYLOV EXPONENTIATION (Matrix-Free)
 # ============================================================================
 
-@jit
-def krylov_expm(H_apply: Callable, v0: jnp.ndarray, t: float, 
-                m: int = 30, tol: float = 1e-10) -> jnp.ndarray:
-    """
-    Compute exp(-iHt)|v0⟩ using Krylov subspace method.
-    
-    Matrix-free: only requires H|v⟩ action, not full H matrix.
-    Scales to large Hilbert spaces (10^6+ dimensions).
-    
-    Args:
-        H_apply: Function that computes H|v⟩
-        v0: Initial state vector
-        t: Evolution time
-        m: Krylov subspace dimension
-        tol: Convergence tolerance
-    
-    Returns:
-        exp(-iHt)|v0⟩
-    """
+def _arnoldi_expm(H_apply: Callable, v0: jnp.ndarray, beta0: float, t: float,
+                  m: int, tol: float, dtype) -> jnp.ndarray:
+    """General H: Arnoldi (CGS2) basis, Padé expm of the (m+1)² Hessenberg matrix"""
     n = len(v0)
     
     # Build Krylov subspace {v0, Hv0, H²v0, ..., H^m v0}
-    V = jnp.zeros((n, m+1), dtype=jnp.complex128)
+    V = jnp.zeros((n, m+1), dtype=dtype)
     H_krylov = jnp.zeros((m+1, m+1), dtype=jnp.complex128)
     
     # Arnoldi iteration
-    V = V.at[:, 0].set(v0 / jnp.linalg.norm(v0))
+    V = V.at[:, 0].set((v0 / beta0).astype(dtype))
+    rows = jnp.arange(m+1)
     
-    for j in range(m):
-        # Apply Hamiltonian
-        w = H_apply(V[:, j])
+    def arnoldi_step(j, state):
+        V, H_krylov, breakdown = state
         
-        # Gram-Schmidt orthogonalization
-        for i in range(j+1):
-            H_krylov = H_krylov.at[i, j].set(jnp.vdot(V[:, i], w))
-            w = w - H_krylov[i, j] * V[:, i]
+        # Apply Hamiltonian; projections accumulate in complex128
+        w = H_apply(V[:, j]).astype(jnp.complex128)
         
-        # Normalize
-        H_krylov = H_krylov.at[j+1, j].set(jnp.linalg.norm(w))
+        # Classical Gram-Schmidt against V[:, :j+1], applied twice (CGS2)
+        h = jnp.where(rows <= j, jnp.conj(V.T) @ w, 0)
+        w = w - V @ h
+        h2 = jnp.where(rows <= j, jnp.conj(V.T) @ w, 0)
+        w = w - V @ h2
+        h = h + h2
         
-        if jnp.abs(H_krylov[j+1, j]) < tol:
-            break
+        # Normalize; on breakdown the subspace is invariant, keep zeros
+        norm = jnp.linalg.norm(w)
+        breakdown = breakdown | (norm < tol)
+        h = h.at[j+1].set(jnp.where(breakdown, 0.0, norm))
+        v_next = jnp.where(breakdown, 0.0, w / jnp.where(breakdown, 1.0, norm))
         
-        V = V.at[:, j+1].set(w / H_krylov[j+1, j])
+        return V.at[:, j+1].set(v_next.astype(dtype)), H_krylov.at[:, j].set(h), breakdown
+    
+    V, H_krylov, _ = jax.lax.fori_loop(0, m, arnoldi_step,
+                                       (V, H_krylov, jnp.array(False)))
     
     # Exponentiate small Krylov Hamiltonian
     e1 = jnp.zeros(m+1, dtype=jnp.complex128)
     e1 = e1.at[0].set(1.0)
     
-    exp_H_krylov = expm(-1j * t * H_krylov[:m+1, :m+1])
-    coeffs = jnp.linalg.norm(v0) * exp_H_krylov @ e1
+    exp_H_krylov = expm(-1j * t * H_krylov)
+    coeffs = beta0 * exp_H_krylov @ e1
     
     # Project back to original space
-    result = V[:, :m+1] @ coeffs
+    return V @ coeffs
+
+
+def _lanczos_expm(H_apply: Callable, v0: jnp.ndarray, beta0: float, t: float,
+                  m: int, tol: float, dtype) -> jnp.ndarray:
+    """Hermitian H: three-term Lanczos, eigh of the m×m tridiagonal T"""
+    n = len(v0)
+    
+    V = jnp.zeros((n, m+1), dtype=dtype)
+    V = V.at[:, 0].set((v0 / beta0).astype(dtype))
+    alpha = jnp.zeros(m)
+    beta = jnp.zeros(m)
+    
+    def lanczos_step(j, state):
+        V, alpha, beta, v_prev, breakdown = state
+        v = V[:, j].astype(jnp.complex128)
+        
+        w = H_apply(V[:, j]).astype(jnp.complex128) - beta[j-1] * v_prev
+        a = jnp.real(jnp.vdot(v, w))
+        w = w - a * v
+        
+        norm = jnp.linalg.norm(w)
+        breakdown = breakdown | (norm < tol)
+        b = jnp.where(breakdown, 0.0, norm)
+        v_next = jnp.where(breakdown, 0.0, w / jnp.where(breakdown, 1.0, norm))
+        
+        V = V.at[:, j+1].set(v_next.astype(dtype))
+        return V, alpha.at[j].set(a), beta.at[j].set(b), v, breakdown
     
-    return result
+    # beta[-1] is read at j = 0 but still zero then
+    V, alpha, beta, _, _ = jax.lax.fori_loop(
+        0, m, lanczos_step, (V, alpha, beta, jnp.zeros_like(v0), jnp.array(False)))
+    
+    # exp(-iTt)e1 through the spectrum of T
+    off = beta[:m-1]
+    T = jnp.diag(alpha) + jnp.diag(off, 1) + jnp.diag(off, -1)
+    w, U = jnp.linalg.eigh(T)
+    coeffs = beta0 * (U @ (jnp.exp(-1j * t * w) * U[0, :]))
+    
+    return V[:, :m] @ coeffs
+
+
+@partial(jit, static_argnames=('H_apply', 'm', 'tol', 'hermitian', 'dtype'))
+def krylov_expm(H_apply: Callable, v0: jnp.ndarray, t: float, 
+                m: int = 30, tol: float = 1e-10,
+                hermitian: bool = True,
+                dtype=jnp.complex128) -> jnp.ndarray:
+    """
+    Compute exp(-iHt)|v0⟩ using Krylov subspace method.
+    
+    Matrix-free: only requires H|v⟩ action, not full H matrix.
+    Scales to large Hilbert spaces (10^6+ dimensions).
+    
+    Args:
+        H_apply: Function that computes H|v⟩ (static, must be hashable)
+        v0: Initial state vector
+        t: Evolution time
+        m: Krylov subspace dimension (static)
+        tol: Convergence tolerance (static)
+        hermitian: H = H† (Lanczos + eigh); False uses Arnoldi + expm
+        dtype: Storage type of the n×(m+1) basis (static). complex64
+               halves its memory traffic; inner products, the Krylov
+               matrix and its exponential stay in complex128.
+    
+    Returns:
+        exp(-iHt)|v0⟩ (complex128)
+    """
+    v0 = jnp.asarray(v0, dtype=jnp.complex128)
+    beta0 = jnp.linalg.norm(v0)
+    if hermitian:
+        return _lanczos_expm(H_apply, v0, beta0, t, m, tol, dtype)
+    return _arnoldi_expm(H_apply, v0, beta0, t, m, tol, dtype)
+
+
+_PAULI = jnp.array([[[0, 1], [1, 0]],
+                    [[0, -1j], [1j, 0]],
+                    [[1, 0], [0, -1]]], dtype=jnp.complex128)
+
+
+@jit
+def pauli_expm(n: jnp.ndarray, t: float) -> jnp.ndarray:
+    """
+    exp(-i t n·σ) = cos(|n|t) I - i sin(|n|t) n̂·σ for a single qubit.
+    
+    Closed form replaces the Padé expm for 2×2 Hamiltonians; written with
+    sinc so it stays differentiable at n = 0.
+    """
+    # |n| with a finite gradient at n = 0 (double-where)
+    r2 = jnp.sum(n**2)
+    r = jnp.where(r2 > 0, jnp.sqrt(jnp.where(r2 > 0, r2, 1.0)), 0.0)
+    n_sigma = jnp.einsum('a,aij->ij', n.astype(jnp.complex128), _PAULI)
+    return (jnp.cos(r * t) * jnp.eye(2, dtype=jnp.complex128)
+            - 1j * t * jnp.sinc(r * t / jnp.pi) * n_sigma)
 
 
 # ============================================================================
 # LINDBLAD MASTER EQUATION
 # ============================================================================
 
+def stack_jump_ops(L_ops: list, n: int) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+    """
+    Stack Lindblad operators into (K, n, n) arrays.
+    
+    Returns:
+        (L, L_dag, L_dag @ L), with K = 0 when L_ops is empty
+    """
+    if len(L_ops) == 0:
+        L = jnp.zeros((0, n, n), dtype=jnp.complex128)
+    else:
+        L = jnp.stack([jnp.asarray(L_k, dtype=jnp.complex128) for L_k in L_ops])
+    L_dag = jnp.conj(L).swapaxes(-1, -2)
+    LdL = jnp.einsum('kij,kjl->kil', L_dag, L)
+    return L, L_dag, LdL
+
+
+class OneSparseJumps(NamedTuple):
+    """
+    Jump operators with at most one non-zero per column:
+    L_k[rows[k, j], j] = coeffs[k, j] (Pauli dephasing, σ±, ladder ops).
+    
+    L ρ L† is then a weighted scatter-add of ρ, O(n²) instead of O(n³).
+    """
+    rows: jnp.ndarray     # (K, n) int
+    coeffs: jnp.ndarray   # (K, n) complex
+    
+    @classmethod
+    def from_dense(cls, L: jnp.ndarray) -> 'OneSparseJumps':
+        """Convert stacked (K, n, n) operators; ValueError if not 1-sparse"""
+        L_np = np.asarray(L)
+        if np.any(np.count_nonzero(L_np, axis=1) > 1):
+            raise ValueError("sparse=True needs jump operators with at most "
+                             "one non-zero per column")
+        rows = np.argmax(L_np != 0, axis=1)
+        coeffs = np.take_along_axis(L_np, rows[:, None, :], axis=1)[:, 0, :]
+        return cls(jnp.asarray(rows), jnp.asarray(coeffs))
+    
+    def sandwich(self, rho: jnp.ndarray, gammas: jnp.ndarray) -> jnp.ndarray:
+        """Σ_k γ_k L_k ρ L_k†"""
+        c = self.coeffs
+        M = gammas[:, None, None] * c[:, :, None] * rho[None] * jnp.conj(c)[:, None, :]
+        r = self.rows
+        return jnp.zeros_like(rho).at[r[:, :, None], r[:, None, :]].add(M)
+
+
+class DiagonalHamiltonian(NamedTuple):
+    """H = diag(diag) in the computational basis (ZZ couplings, detunings)"""
+    diag: jnp.ndarray     # (n,)
+    
+    def dense(self) -> jnp.ndarray:
+        return jnp.diag(jnp.asarray(self.diag, dtype=jnp.complex128))
+
+
+@jit
+def _evolve_diagonal(rho0: jnp.ndarray, diag: jnp.ndarray,
+                     times: jnp.ndarray) -> jnp.ndarray:
+    """Exact noiseless evolution under diagonal H: ρ_ij(t) = e^{-i(h_i-h_j)t} ρ_ij(0)"""
+    phases = jnp.exp(-1j * jnp.outer(times, diag))
+    return phases[:, :, None] * rho0[None] * jnp.conj(phases)[:, None, :]
+
+
 @jit
-def lindblad_rhs(rho: jnp.ndarray, H: jnp.ndarray, 
-                 L_ops: list, gammas: jnp.ndarray) -> jnp.ndarray:
+def effective_hamiltonian(H: jnp.ndarray, LdL: jnp.ndarray,
+                          gammas: jnp.ndarray) -> jnp.ndarray:
+    """Non-Hermitian generator H_nh = -iH - ½ Σ_k γ_k L_k†L_k"""
+    return -1j * H - 0.5 * jnp.einsum('k,kij->ij', gammas, LdL)
+
+
+@partial(jit, static_argnames=('hermitian',))
+def lindblad_rhs(rho: jnp.ndarray, Hnh: jnp.ndarray, L: jnp.ndarray,
+                 L_dag: jnp.ndarray, gammas: jnp.ndarray,
+                 hermitian: bool = True) -> jnp.ndarray:
     """
     Right-hand side of Lindblad equation:
     
     dρ/dt = -i[H, ρ] + Σ_k γ_k (L_k ρ L_k† - ½{L_k†L_k, ρ})
+          = H_nh ρ + ρ H_nh† + Σ_k γ_k L_k ρ L_k†
+    
+    For Hermitian ρ the second half is the adjoint of the first, so only
+    H_nh ρ + ½ Σ_k γ_k L_k ρ L_k† is computed.
     
     Args:
         rho: Density matrix (n×n)
-        H: Hamiltonian (n×n)
-        L_ops: List of Lindblad operators
-        gammas: Decoherence rates
+        Hnh: Effective Hamiltonian (n×n), see effective_hamiltonian
+        L: Stacked Lindblad operators (K×n×n), see stack_jump_ops,
+           or OneSparseJumps
+        L_dag: Their adjoints (K×n×n), unused for OneSparseJumps
+        gammas: Decoherence rates (K,)
+        hermitian: Assume ρ = ρ† (set False for general operators)
     
     Returns:
         dρ/dt
     """
-    # Unitary part: -i[H, ρ]
-    commutator = -1j * (H @ rho - rho @ H)
-    
-    # Dissipative part
-    dissipator = jnp.zeros_like(rho)
+    if isinstance(L, OneSparseJumps):
+        jumps = L.sandwich(rho, gammas)
+    else:
+        jumps = jnp.einsum('k,kij,jl,klm->im', gammas, L, rho, L_dag)
     
-    for L_k, gamma_k in zip(L_ops, gammas):
-        L_dag = jnp.conj(L_k.T)
-        L_dag_L = L_dag @ L_k
-        
-        dissipator += gamma_k * (L_k @ rho @ L_dag - 
-                                0.5 * (L_dag_L @ rho + rho @ L_dag_L))
+    if hermitian:
+        half = Hnh @ rho + 0.5 * jumps
+        return half + half.conj().T
     
-    return commutator + dissipator
+    return Hnh @ rho + rho @ Hnh.conj().T + jumps
 
 
-@jit
-def rk4_step(rho: jnp.ndarray, H: jnp.ndarray, L_ops: list,
-             gammas: jnp.ndarray, dt: float) -> jnp.ndarray:
-    """4th-order Runge-Kutta step for Lindblad equation"""
-    
-    k1 = lindblad_rhs(rho, H, L_ops, gammas)
-    k2 = lindblad_rhs(rho + 0.5*dt*k1, H, L_ops, gammas)
-    k3 = lindblad_rhs(rho + 0.5*dt*k2, H, L_ops, gammas)
-    k4 = lindblad_rhs(rho + dt*k3, H, L_ops, gammas)
+@partial(jit, static_argnames=('hermitian',), donate_argnums=(0,))
+def rk4_step(rho: jnp.ndarray, Hnh: jnp.ndarray, L: jnp.ndarray,
+             L_dag: jnp.ndarray, gammas: jnp.ndarray, dt: float,
+             hermitian: bool = True) -> jnp.ndarray:
+    """
+    4th-order Runge-Kutta step for Lindblad equation
     
-    rho_new = rho + (dt/6) * (k1 + 2*k2 + 2*k3 + k4)
+    All operands are arrays, so one compilation serves every call with
+    the same (n, K). The input ρ buffer is donated to the result; do not
+    reuse ρ after a top-level call.
+    """
     
-    # Ensure trace preservation
-    rho_new = rho_new / jnp.trace(rho_new)
+    f = partial(lindblad_rhs, Hnh=Hnh, L=L, L_dag=L_dag, gammas=gammas,
+                hermitian=hermitian)
+    k1 = f(rho)
+    k2 = f(rho + 0.5*dt*k1)
+    k3 = f(rho + 0.5*dt*k2)
+    k4 = f(rho + dt*k3)
     
-    return rho_new
+    # One elementwise expression, so XLA fuses it into a single pass
+    return rho + dt * (k1/6 + k2/3 + k3/3 + k4/6)
+
+
+@partial(jit, static_argnames=('n_steps', 'trace_correct', 'hermitian'))
+def _lindblad_trajectory(rho0: jnp.ndarray, Hnh: jnp.ndarray, L: jnp.ndarray,
+                         L_dag: jnp.ndarray, gammas: jnp.ndarray, dt: float,
+                         n_steps: int, trace_correct: int = 0,
+                         hermitian: bool = True) -> jnp.ndarray:
+    """RK4 trajectory of n_steps states (rho0 first) as a single lax.scan"""
+    dt = jnp.asarray(dt, dtype=gammas.dtype)
+    
+    def step(rho, i):
+        rho = rk4_step(rho, Hnh, L, L_dag, gammas, dt, hermitian)
+        if trace_correct > 0:
+            rho = jax.lax.cond(i % trace_correct == 0,
+                               lambda r: (r / jnp.trace(r.astype(jnp.complex128))).astype(r.dtype),
+                               lambda r: r, rho)
+        return rho, rho
+    
+    _, rho_rest = jax.lax.scan(step, rho0, jnp.arange(1, n_steps))
+    return jnp.concatenate([rho0[None], rho_rest])
+
+
+@partial(jit, static_argnames=('rtol', 'atol', 'max_steps', 'hermitian'))
+def _lindblad_trajectory_adaptive(rho0: jnp.ndarray, Hnh: jnp.ndarray, L: jnp.ndarray,
+                                  L_dag: jnp.ndarray, gammas: jnp.ndarray,
+                                  times: jnp.ndarray, dt: float,
+                                  rtol: float = 1e-6, atol: float = 1e-9,
+                                  max_steps: int = 4096,
+                                  hermitian: bool = True) -> jnp.ndarray:
+    """Adaptive Tsit5 trajectory (diffrax), saved on the fixed time grid"""
+    term = diffrax.ODETerm(
+        lambda t, rho, args: lindblad_rhs(rho, *args, hermitian=hermitian))
+    sol = diffrax.diffeqsolve(
+        term, diffrax.Tsit5(), t0=times[0], t1=times[-1], dt0=dt, y0=rho0,
+        args=(Hnh, L, L_dag, gammas),
+        saveat=diffrax.SaveAt(ts=times), max_steps=max_steps,
+        stepsize_controller=diffrax.PIDController(rtol=rtol, atol=atol))
+    return sol.ys
 
 
 def evolve_lindblad(rho0: jnp.ndarray, H: jnp.ndarray, L_ops: list,
                     gammas: jnp.ndarray, t_span: Tuple[float, float],
-                    dt: float = 0.01) -> Tuple[jnp.ndarray, jnp.ndarray]:
+                    dt: float = 0.01,
+                    trace_correct: int = 0,
+                    hermitian: bool = True,
+                    sparse: bool = False,
+                    dtype=jnp.complex128,
+                    method: str = 'rk4',
+                    rtol: float = 1e-6,
+                    atol: float = 1e-9,
+                    max_steps: int = None) -> Tuple[jnp.ndarray, jnp.ndarray]:
     """
     Evolve density matrix under Lindblad dynamics.
     
+    The Lindblad generator is trace-preserving, so the trace is only
+    renormalized on request (long runs or coarse dt).
+    
+    Integrates with fixed-step RK4 at dt by default; method='tsit5'
+    switches to adaptive Tsit5 (diffrax), reported on the same dt grid.
+    
     Args:
         rho0: Initial density matrix
-        H: Hamiltonian
+        H: Hamiltonian (n×n), or DiagonalHamiltonian
         L_ops: Lindblad operators
         gammas: Decoherence rates
         t_span: (t_start, t_end)
         dt: Time step
+        trace_correct: Renormalize Tr(ρ) every this many RK4 steps (0 = never)
+        hermitian: ρ0 is Hermitian (halves the RHS matmuls)
+        sparse: Jump operators are 1-sparse per column (see OneSparseJumps)
+        dtype: State/operator precision; complex64 halves memory traffic
+               (trace corrections are still summed in complex128)
+        method: 'rk4' (fixed step) or 'tsit5' (adaptive, needs diffrax)
+        rtol, atol: Step-size controller tolerances for 'tsit5'
+        max_steps: Solver step budget for 'tsit5', accepted and rejected
+                   steps alike (default: 4× the dt grid, at least 4096)
     
     Returns:
         (times, rho_history)
@@ -163,14 +396,42 @@ def evolve_lindblad(rho0: jnp.ndarray, H: jnp.ndarray, L_ops: list,
     times = jnp.arange(t_start, t_end, dt)
     n_steps = len(times)
     
-    # Pre-allocate history
-    rho_history = jnp.zeros((n_steps, *rho0.shape), dtype=jnp.complex128)
-    rho_history = rho_history.at[0].set(rho0)
-    
-    rho = rho0
-    for i in range(1, n_steps):
-        rho = rk4_step(rho, H, L_ops, gammas, dt)
-        rho_history = rho_history.at[i].set(rho)
+    # Diagonal H without noise: closed form, no integrator
+    if isinstance(H, DiagonalHamiltonian):
+        if len(L_ops) == 0:
+            rho_history = _evolve_diagonal(rho0.astype(jnp.complex128),
+                                           jnp.real(H.diag), times)
+            return times, rho_history.astype(dtype)
+        H = H.dense()
+    
+    # Jump operators are constant over the trajectory: stack them once
+    L, L_dag, LdL = stack_jump_ops(L_ops, rho0.shape[0])
+    gammas = jnp.asarray(gammas, dtype=jnp.float64)
+    Hnh = effective_hamiltonian(jnp.asarray(H, dtype=jnp.complex128), LdL, gammas)
+    if sparse:
+        L, L_dag = OneSparseJumps.from_dense(L), None
+    
+    # Build in f64, then store everything the scan touches in dtype
+    real_dtype = jnp.finfo(dtype).dtype
+    Hnh, L, L_dag = jax.tree_util.tree_map(
+        lambda x: x.astype(dtype) if jnp.iscomplexobj(x) else x, (Hnh, L, L_dag))
+    
+    if method == 'tsit5':
+        if not DIFFRAX_AVAILABLE:
+            raise ImportError("method='tsit5' requires diffrax (pip install diffrax)")
+        if trace_correct > 0:
+            raise ValueError("trace_correct only applies to method='rk4'")
+        if max_steps is None:
+            max_steps = max(4096, 4 * n_steps)
+        rho_history = _lindblad_trajectory_adaptive(
+            rho0.astype(dtype), Hnh, L, L_dag, gammas.astype(real_dtype),
+            times.astype(real_dtype), dt, rtol, atol, max_steps, hermitian)
+    elif method == 'rk4':
+        rho_history = _lindblad_trajectory(rho0.astype(dtype), Hnh, L, L_dag,
+                                           gammas.astype(real_dtype), dt, n_steps,
+                                           trace_correct, hermitian)
+    else:
+        raise ValueError(f"Unknown method '{method}' (use 'tsit5' or 'rk4')")
     
     return times, rho_history
 
@@ -190,25 +451,36 @@ def fidelity(rho: jnp.ndarray, target: jnp.ndarray) -> float:
         # Pure state target
         return jnp.real(jnp.vdot(target, rho @ target))
     else:
-        # General case (expensive)
-        sqrt_rho = jnp.linalg.matrix_power(rho, 0.5)
+        # General case: √ρ via eigh (ρ is Hermitian PSD), then
+        # Tr√M = Σ √λ(M) for the Hermitian PSD M = √ρ target √ρ
+        w, U = jnp.linalg.eigh(rho)
+        sqrt_rho = (U * jnp.sqrt(jnp.clip(w, 0))) @ U.conj().T
         M = sqrt_rho @ target @ sqrt_rho
-        return jnp.real(jnp.trace(jnp.linalg.matrix_power(M, 0.5)))**2
+        w_M = jnp.linalg.eigvalsh(M)
+        return jnp.sum(jnp.sqrt(jnp.clip(w_M, 0)))**2
+
+
+class Weights(NamedTuple):
+    """H_meta term weights (α, β, γ, δ); a pytree, so jit traces them as data"""
+    fidelity: float = 1.0
+    latency: float = 0.1
+    energy: float = 0.01
+    resource: float = 0.001
 
 
 @jit
 def h_meta_objective(params: jnp.ndarray, rho_final: jnp.ndarray,
-                     target: jnp.ndarray, weights: dict) -> float:
+                     target: jnp.ndarray, weights: Weights) -> float:
     """
     Meta-optimization objective:
     
     H_meta(θ) = α (1-F) + β L + γ E + δ R
     
     Args:
-        params: Optimization parameters θ
+        params: Optimization parameters θ, θ[0] = total time (len ≥ 2)
         rho_final: Final density matrix
         target: Target state
-        weights: {fidelity, latency, energy, resource}
+        weights: Weights(fidelity, latency, energy, resource)
     
     Returns:
         Scalar objective to minimize
@@ -218,64 +490,87 @@ def h_meta_objective(params: jnp.ndarray, rho_final: jnp.ndarray,
     infidelity = 1 - F
     
     # Latency term (from params[0] = total time)
-    latency = params[0] if len(params) > 0 else 1.0
+    latency = params[0]
     
     # Energy term (integrated ∫ Tr(H ρ) dt, approximated)
-    energy = jnp.sum(jnp.abs(params[1:])**2) if len(params) > 1 else 0.0
-    
-    # Resource term (number of non-zero parameters)
-    resources = jnp.sum(jnp.abs(params) > 1e-6)
+    energy = jnp.sum(jnp.abs(params[1:])**2)
     
-    # Weighted sum
-    alpha = weights.get('fidelity', 1.0)
-    beta = weights.get('latency', 0.1)
-    gamma = weights.get('energy', 0.01)
-    delta = weights.get('resource', 0.001)
+    # Resource term: smooth count of non-zero parameters (soft L0)
+    resources = jnp.sum(jnp.tanh((jnp.abs(params) / 1e-3)**2))
     
-    return alpha * infidelity + beta * latency + gamma * energy + delta * resources
+    return (weights.fidelity * infidelity + weights.latency * latency +
+            weights.energy * energy + weights.resource * resources)
 
 
 def optimize_h_meta(initial_params: jnp.ndarray, 
                     evolution_func: Callable,
                     target: jnp.ndarray,
-                    weights: dict,
+                    weights: Weights,
                     n_steps: int = 100,
-                    learning_rate: float = 0.01) -> Tuple[jnp.ndarray, list]:
+                    learning_rate: float = 0.01,
+                    optimizer=None) -> Tuple[jnp.ndarray, jnp.ndarray]:
     """
     Gradient descent on H_meta to find optimal parameters.
     
+    The whole descent is one lax.scan; the objective history is only
+    brought back to the host (and printed) once it has finished.
+    A (N, P) batch of initial parameters runs N independent restarts
+    in one vmapped kernel.
+    
     Args:
-        initial_params: θ₀
+        initial_params: θ₀, shape (P,) or (N, P) for N restarts
         evolution_func: Function (θ) → ρ_final
         target: Target state
-        weights: Objective weights
+        weights: Objective weights (Weights, or a dict of its fields)
         n_steps: Optimization iterations
         learning_rate: Step size
+        optimizer: Optional optax GradientTransformation
+                   (default: optax.sgd(learning_rate), or plain SGD without optax)
     
     Returns:
-        (optimal_params, objective_history)
+        (optimal_params, objective_history), with a leading N axis for batches
     """
-    params = initial_params
-    history = []
+    if isinstance(weights, dict):
+        weights = Weights(**weights)
+    if initial_params.shape[-1] < 2:
+        raise ValueError("H_meta needs at least 2 parameters (time, amplitudes)")
     
     # Define loss function
     def loss(p):
         rho_final = evolution_func(p)
         return h_meta_objective(p, rho_final, target, weights)
     
-    # Compute gradient function
-    grad_loss = jit(grad(loss))
+    value_and_grad_loss = jax.value_and_grad(loss)
     
-    # Gradient descent
-    for step in range(n_steps):
-        obj = loss(params)
-        history.append(obj)
+    if optimizer is None and OPTAX_AVAILABLE:
+        optimizer = optax.sgd(learning_rate)
+    
+    if optimizer is not None:
+        def step(carry, _):
+            params, opt_state = carry
+            obj, g = value_and_grad_loss(params)
+            updates, opt_state = optimizer.update(g, opt_state, params)
+            return (optax.apply_updates(params, updates), opt_state), obj
         
-        g = grad_loss(params)
-        params = params - learning_rate * g
+        def descend(params0):
+            init = (params0, optimizer.init(params0))
+            (params, _), history = jax.lax.scan(step, init, None, length=n_steps)
+            return params, history
+    else:
+        def step(params, _):
+            obj, g = value_and_grad_loss(params)
+            return params - learning_rate * g, obj
         
-        if step % 10 == 0:
-            print(f"Step {step}: Objective = {obj:.6f}")
+        def descend(params0):
+            return jax.lax.scan(step, params0, None, length=n_steps)
+    
+    if initial_params.ndim == 2:
+        return jit(vmap(descend))(initial_params)
+    
+    params, history = jit(descend)(initial_params)
+    
+    for i, obj in enumerate(np.asarray(history)[::10]):
+        print(f"Step {10*i}: Objective = {obj:.6f}")
     
     return params, history
 
@@ -304,8 +599,8 @@ def demo_1qubit_evolution():
     times, rho_hist = evolve_lindblad(rho0, H, L_ops, gammas, (0, 5), dt=0.01)
     
     # Compute populations
-    pop_0 = jnp.array([jnp.real(rho[0,0]) for rho in rho_hist])
-    pop_1 = jnp.array([jnp.real(rho[1,1]) for rho in rho_hist])
+    pop_0 = jnp.real(rho_hist[:, 0, 0])
+    pop_1 = jnp.real(rho_hist[:, 1, 1])
     
     print(f"Initial: P(0) = {pop_0[0]:.3f}, P(1) = {pop_1[0]:.3f}")
     print(f"Final:   P(0) = {pop_0[-1]:.3f}, P(1) = {pop_1[-1]:.3f}")
@@ -317,8 +612,8 @@ def demo_2qubit_entanglement():
     print("\n[Demo 2: Two-Qubit Entanglement]")
     
     # Hamiltonian: ZZ interaction
-    Z = jnp.array([[1, 0], [0, -1]], dtype=jnp.complex128)
-    H = jnp.kron(Z, Z)  # 4×4
+    z = jnp.array([1.0, -1.0])
+    H = DiagonalHamiltonian(jnp.kron(z, z))  # diag of Z⊗Z
     
     # Initial state: |00⟩
     psi0 = jnp.array([1, 0, 0, 0], dtype=jnp.complex128)
@@ -335,12 +630,11 @@ def demo_2qubit_entanglement():
     
     # Compute entanglement entropy
     # Partial trace over second qubit
-    rho_A = jnp.array([[rho_final[0,0] + rho_final[1,1], rho_final[0,2] + rho_final[1,3]],
-                       [rho_final[2,0] + rho_final[3,1], rho_final[2,2] + rho_final[3,3]]])
+    rho_A = jnp.trace(rho_final.reshape(2, 2, 2, 2), axis1=1, axis2=3)
     
-    eigenvals = jnp.linalg.eigvalsh(rho_A)
-    eigenvals = eigenvals[eigenvals > 1e-10]  # Remove numerical zeros
-    entropy = -jnp.sum(eigenvals * jnp.log(eigenvals))
+    # xlogy(0, 0) = 0, so zero eigenvalues need no dynamic-shape mask
+    eigenvals = jnp.clip(jnp.linalg.eigvalsh(rho_A), 0)
+    entropy = -jnp.sum(xlogy(eigenvals, eigenvals))
     
     print(f"Entanglement entropy: S = {entropy:.4f}")
     print(f"Max entropy (maximally entangled): S = {jnp.log(2):.4f}")
@@ -355,29 +649,32 @@ def demo_h_meta_optimization():
     
     # Parameterized Hamiltonian: H(θ) = θ₁ σ_x + θ₂ σ_z
     def evolution_func(params):
-        H = params[0] * jnp.array([[0, 1], [1, 0]], dtype=jnp.complex128) + \
-            params[1] * jnp.array([[1, 0], [0, -1]], dtype=jnp.complex128)
-        
         psi0 = jnp.array([1, 0], dtype=jnp.complex128)
         t = 1.0
         
-        # Exact evolution (small system)
-        U = expm(-1j * H * t)
+        # Exact evolution (closed-form single-qubit propagator)
+        U = pauli_expm(jnp.array([params[0], 0.0, params[1]]), t)
         psi_final = U @ psi0
         
         return jnp.outer(psi_final, jnp.conj(psi_final))
     
-    # Initial guess
-    params0 = jnp.array([0.5, 0.5])
+    # Initial guess, plus random restarts (non-convex landscape)
+    n_restarts = 8
+    keys = jax.random.split(jax.random.PRNGKey(0), n_restarts - 1)
+    params0 = jnp.concatenate([jnp.array([[0.5, 0.5]]),
+                               vmap(lambda k: jax.random.normal(k, (2,)))(keys)])
     
-    weights = {'fidelity': 10.0, 'latency': 0.0, 'energy': 0.01, 'resource': 0.0}
+    weights = Weights(fidelity=10.0, latency=0.0, energy=0.01, resource=0.0)
     
-    # Optimize
-    params_opt, history = optimize_h_meta(params0, evolution_func, target, weights, 
-                                          n_steps=50, learning_rate=0.1)
+    # Optimize all restarts as one batched descent
+    params_all, histories = optimize_h_meta(params0, evolution_func, target, weights, 
+                                            n_steps=50, learning_rate=0.1)
     
-    print(f"Optimized parameters: θ = {params_opt}")
-    print(f"Final fidelity: F = {1 - history[-1]/weights['fidelity']:.6f}")
+    final = histories[:, -1]
+    best = int(jnp.argmin(final))
+    print(f"Restarts: {n_restarts}, final objectives = {np.round(np.asarray(final), 4)}")
+    print(f"Optimized parameters: θ = {params_all[best]} (restart {best})")
+    print(f"Final fidelity: F = {1 - final[best]/weights.fidelity:.6f}")
 
 
 # ============================================================================
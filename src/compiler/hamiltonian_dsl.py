@@ -9,10 +9,19 @@ import sympy as sp
 import numpy as np
 from typing import Callable, List, Dict, Any, Optional
 from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+import hashlib
+import importlib.util
 import inspect
+import os
+import sys
 
 from core import PhaseSpace, HamiltonianSystem
 
+# njit is imported by the generated kernel sources, not here
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+
 
 @dataclass
 class SystemDefinition:
@@ -148,6 +157,203 @@ class {system_def.name}(HamiltonianSystem):
         return code
 
 
+class _SymbolNamespace:
+    """Attribute namespace whose members are SymPy symbols (for tracing)"""
+    def __init__(self, symbols_by_name: Dict[str, sp.Symbol]):
+        for name, sym in symbols_by_name.items():
+            setattr(self, name, sym)
+
+
+def _trace_hamiltonian(cls, coords: List[str], kinetic_method, potential_method):
+    """
+    Trace kinetic and potential through SymPy symbols.
+    
+    Returns (q_symbols, p_symbols, T_expr, V_expr), or None when either
+    method is not expressible symbolically (e.g. calls NumPy reductions).
+    """
+    if kinetic_method is None or potential_method is None:
+        return None
+    
+    q_syms = [sp.Symbol(f'q_{name}', real=True) for name in coords]
+    p_syms = [sp.Symbol(f'p_{name}', real=True) for name in coords]
+    q_ns = _SymbolNamespace({name: q for name, q in zip(coords, q_syms)})
+    p_ns = _SymbolNamespace({f'p{name}': p for name, p in zip(coords, p_syms)})
+    
+    try:
+        T = sp.sympify(kinetic_method(cls(), p_ns))
+        V = sp.sympify(potential_method(cls(), q_ns))
+    except Exception:
+        return None
+    if not (T + V).free_symbols <= set(q_syms) | set(p_syms):
+        return None
+    return q_syms, p_syms, T, V
+
+
+def _lambdify_system(traced):
+    """
+    NumPy callables T(*p), V(*q) and the analytic force F(*q) = -∇V
+    for a traced system, or None when it could not be traced or uses
+    functions NumPy has no counterpart for (besselj, DiracDelta, ...).
+    """
+    if traced is None:
+        return None
+    q_syms, p_syms, T, V = traced
+    symbolic = SimpleNamespace(
+        T=sp.lambdify(p_syms, T, 'numpy'),
+        V=sp.lambdify(q_syms, V, 'numpy'),
+        F=sp.lambdify(q_syms, [-sp.diff(V, q) for q in q_syms], 'numpy'),
+    )
+    # lambdify leaves unsupported functions as bare names
+    probe = np.ones(len(q_syms))
+    for func in (symbolic.T, symbolic.V, symbolic.F):
+        try:
+            with np.errstate(all='ignore'):
+                func(*probe)
+        except NameError:
+            return None
+        except Exception:
+            pass  # singular at the probe point, not a printing problem
+    return symbolic
+
+
+def _kernel_source(q_syms, p_syms, T, V) -> str:
+    """
+    Python source for the njit kernels of a traced system.
+    
+    - hamiltonian(q, p) -> H
+    - force(q) -> -∂V/∂q
+    - verlet_trajectory(q, p, dt, q_traj, p_traj): Verlet over all rows
+      of the preallocated trajectories (row 0 holds the initial state)
+    - step_and_energy(q, p, dt) -> (q_new, p_new, H_new): one Velocity
+      Verlet step (same scheme as HamiltonianSystem._verlet_step) with the
+      analytic force -∂V/∂q, and H evaluated on the registers it just
+      wrote instead of re-reading the state.
+    """
+    def code(expr):
+        return sp.pycode(expr, fully_qualified_modules=True)
+    
+    n = len(q_syms)
+    unpack = [f'    {sym} = _q[{i}]' for i, sym in enumerate(q_syms)]
+    unpack += [f'    {sym} = _p[{i}]' for i, sym in enumerate(p_syms)]
+    forces = [f'    f{i} = {code(-sp.diff(V, q))}' for i, q in enumerate(q_syms)]
+    
+    lines = ['import math', 'import numpy as np', 'from numba import njit', '', '',
+             '@njit(cache=True, fastmath=True)', 'def hamiltonian(_q, _p):']
+    lines += unpack
+    lines.append(f'    return {code(T + V)}')
+    lines += ['', '', '@njit(cache=True, fastmath=True)', 'def force(_q):']
+    lines += unpack[:n] + forces
+    lines += [f'    f_out = np.empty({n})'] + [f'    f_out[{i}] = f{i}' for i in range(n)]
+    lines.append('    return f_out')
+    lines += ['', '', '@njit(cache=True, fastmath=True)',
+              'def verlet_trajectory(_q, _p, dt, q_traj, p_traj):',
+              '    f = force(_q)',
+              '    for i in range(1, q_traj.shape[0]):',
+              '        _p = _p + 0.5 * dt * f',
+              '        _q = _q + dt * _p',
+              '        f = force(_q)',
+              '        _p = _p + 0.5 * dt * f',
+              '        q_traj[i] = _q',
+              '        p_traj[i] = _p']
+    lines += ['', '', '@njit(cache=True, fastmath=True)', 'def step_and_energy(_q, _p, dt):']
+    lines += unpack + forces
+    lines += [f'    {p} = {p} + 0.5 * dt * f{i}' for i, p in enumerate(p_syms)]
+    lines += [f'    {q} = {q} + dt * {p}' for q, p in zip(q_syms, p_syms)]
+    lines += forces
+    lines += [f'    {p} = {p} + 0.5 * dt * f{i}' for i, p in enumerate(p_syms)]
+    lines += [f'    q_new = np.empty({n})', f'    p_new = np.empty({n})']
+    lines += [f'    q_new[{i}] = {q}' for i, q in enumerate(q_syms)]
+    lines += [f'    p_new[{i}] = {p}' for i, p in enumerate(p_syms)]
+    lines.append(f'    return q_new, p_new, {code(T + V)}')
+    return '\n'.join(lines) + '\n'
+
+
+# Compiled kernel modules already loaded in this process, by source hash
+_KERNELS: Dict[str, Any] = {}
+
+
+def _kernel_cache_dir() -> Path:
+    """On-disk kernel cache (override with UHF_CACHE_DIR)"""
+    default = Path.home() / '.cache' / 'uhf' / 'compiled'
+    return Path(os.environ.get('UHF_CACHE_DIR', default))
+
+
+def _load_kernel_module(path: Path, key: str):
+    spec = importlib.util.spec_from_file_location(f'uhf_compiled_{key}', path)
+    module = importlib.util.module_from_spec(spec)
+    # numba's cached environments are re-imported by module name on load
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _import_cached_source(source: str, prefix: str = 'h'):
+    """
+    Import generated source as a module file in the kernel cache dir.
+    
+    The file is named by the source's SHA-1, so njit(cache=True) kernels
+    in it get a stable locator and later processes load numba's stored
+    LLVM output instead of recompiling. Returns None if the cache dir is
+    not writable or the generated module fails to import; callers then
+    compile in memory.
+    """
+    key = hashlib.sha1(source.encode()).hexdigest()
+    if key in _KERNELS:
+        return _KERNELS[key]
+    try:
+        cache_dir = _kernel_cache_dir()
+        path = cache_dir / f'{prefix}_{key}.py'
+        if not path.exists():
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_text(source)
+            os.replace(tmp, path)
+        module = _load_kernel_module(path, key)
+    except (OSError, SyntaxError, ImportError):
+        sys.modules.pop(f'uhf_compiled_{key}', None)
+        return None
+    _KERNELS[key] = module
+    return module
+
+
+# Argument types CompiledSystem calls each kernel with
+_KERNEL_SIGNATURES = {
+    'hamiltonian': '(float64[::1], float64[::1])',
+    'force': '(float64[::1],)',
+    'step_and_energy': '(float64[::1], float64[::1], float64)',
+    'verlet_trajectory': '(float64[::1], float64[::1], float64, float64[:, ::1], float64[:, ::1])',
+}
+
+
+def _compile_kernels(traced):
+    """
+    njit-compiled kernels (see _kernel_source) for a traced system.
+    
+    Loaded through _import_cached_source, so later processes that define
+    the same system reuse numba's on-disk cache instead of recompiling.
+    Falls back to in-memory compilation if the cache dir is not
+    writable. The kernels are compiled here rather than on first call,
+    so numba typing errors surface while CompiledSystem can still fall
+    back. Returns None without numba, for untraceable systems or when
+    the expressions cannot be turned into kernel source (SymPy functions
+    with no Python printing, e.g. besselj or DiracDelta) or compiled.
+    """
+    if traced is None or not NUMBA_AVAILABLE:
+        return None
+    try:
+        source = _kernel_source(*traced)
+        kernels = _import_cached_source(source)
+        if kernels is None:
+            namespace: Dict[str, Any] = {}
+            exec(compile(source.replace('cache=True, ', ''), '<uhf_compiled>', 'exec'), namespace)
+            kernels = SimpleNamespace(**namespace)
+        for name, signature in _KERNEL_SIGNATURES.items():
+            getattr(kernels, name).compile(signature)
+    except Exception:
+        return None
+    return kernels
+
+
 def define_system(cls):
     """
     Decorator to define a Hamiltonian system.
@@ -172,14 +378,61 @@ def define_system(cls):
     potential_method = getattr(cls, 'potential', None)
     coupling_method = getattr(cls, 'coupling', None)
     
+    # Trace once: lambdified T/V/-∇V, plus compiled kernels (None if untraceable)
+    traced = _trace_hamiltonian(cls, coords, kinetic_method, potential_method)
+    symbolic = _lambdify_system(traced)
+    kernels = _compile_kernels(traced)
+    
     # Create new class inheriting from HamiltonianSystem
     class CompiledSystem(HamiltonianSystem):
+        _hamiltonian_numba = staticmethod(kernels.hamiltonian) if kernels else None
+        _step_and_energy = staticmethod(kernels.step_and_energy) if kernels else None
+        _verlet_trajectory = staticmethod(kernels.verlet_trajectory) if kernels else None
+        
         def __init__(self, **kwargs):
             super().__init__(n_dof=n_dof)
             self.params = kwargs
             self._original_class = cls
         
+        def hamiltonian(self, q, p):
+            # Compiled path for float64 vectors, Python namespaces otherwise
+            if (self._hamiltonian_numba is not None
+                    and isinstance(q, np.ndarray) and isinstance(p, np.ndarray)
+                    and q.dtype == np.float64 and p.dtype == np.float64
+                    and q.shape == (n_dof,) and p.shape == (n_dof,)):
+                return self._hamiltonian_numba(q, p)
+            return super().hamiltonian(q, p)
+        
+        def step_and_energy(self, state: PhaseSpace, dt: float):
+            """One Verlet step plus the energy after it, fused when compiled"""
+            if self._step_and_energy is not None and state.q.shape == (n_dof,):
+                q_new, p_new, E = self._step_and_energy(state.q, state.p, float(dt))
+                return PhaseSpace(q=q_new, p=p_new), E
+            new_state = super()._verlet_step(state, dt)
+            return new_state, self.hamiltonian(new_state.q, new_state.p)
+        
+        def evolve(self, initial: PhaseSpace, t_max: float, dt: float):
+            # Whole trajectory in one compiled (and disk-cached) kernel call
+            if self._verlet_trajectory is None or initial.q.shape != (n_dof,):
+                return super().evolve(initial, t_max, dt)
+            n_steps = int(np.ceil(t_max / dt))
+            t = np.linspace(0, n_steps * dt, n_steps + 1)
+            q_traj = np.zeros((n_steps + 1, n_dof))
+            p_traj = np.zeros((n_steps + 1, n_dof))
+            q_traj[0] = initial.q
+            p_traj[0] = initial.p
+            self._verlet_trajectory(initial.q.copy(), initial.p.copy(), float(dt), q_traj, p_traj)
+            return t, q_traj, p_traj
+        
+        def _verlet_step(self, state: PhaseSpace, dt: float) -> PhaseSpace:
+            if self._step_and_energy is not None and state.q.shape == (n_dof,):
+                q_new, p_new, _ = self._step_and_energy(state.q, state.p, float(dt))
+                return PhaseSpace(q=q_new, p=p_new)
+            return super()._verlet_step(state, dt)
+        
         def kinetic(self, p):
+            if symbolic is not None:
+                return symbolic.T(*p)
             if kinetic_method:
                 # Create namespace for coordinate access
                 class PNamespace:
@@ -192,6 +445,8 @@ def define_system(cls):
             return super().kinetic(p)
         
         def potential(self, q):
+            if symbolic is not None:
+                return symbolic.V(*q)
             if potential_method:
                 class QNamespace:
                     def __init__(self, q_array):
@@ -203,6 +458,9 @@ def define_system(cls):
             return 0.0
         
         def force(self, q):
+            if symbolic is not None:
+                # Analytic -∇V from the traced expression
+                return np.asarray(symbolic.F(*q), dtype=float)
             # Numerical gradient of potential
             epsilon = 1e-7
             grad = np.zeros_like(q)
@@ -6,9 +6,61 @@ Code generation for Mojo/Cython backends.
 """
 
 import sympy as sp
-from sympy import symbols, diff, simplify, lambdify, Matrix
+from sympy import symbols, diff, lambdify, Matrix
 from typing import List, Tuple, Dict, Callable
+import functools
+import math
 import numpy as np
+from scipy import sparse
+
+from .hamiltonian_dsl import _import_cached_source
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import symengine
+    SYMENGINE_AVAILABLE = True
+except ImportError:
+    SYMENGINE_AVAILABLE = False
+
+
+_RHS_HEADER = 'import math\nimport numpy as np\nfrom numba import njit\n\n\n'
+
+
+def _rhs_source(state_syms, exprs) -> str:
+    """
+    Python source of `equations_of_motion(t, state)` for njit: the state is
+    unpacked into scalars, common subexpressions are hoisted once, and
+    the derivatives are written straight into the output array.
+    """
+    def code(expr):
+        return sp.pycode(expr, fully_qualified_modules=True)
+    
+    replacements, reduced = sp.cse(exprs)
+    lines = ['def equations_of_motion(t, state):']
+    lines += [f'    {sym} = state[{i}]' for i, sym in enumerate(state_syms)]
+    lines += [f'    {sym} = {code(expr)}' for sym, expr in replacements]
+    lines.append(f'    out = np.empty({len(exprs)})')
+    lines += [f'    out[{i}] = {code(expr)}' for i, expr in enumerate(reduced)]
+    lines.append('    return out')
+    return '\n'.join(lines) + '\n'
+
+
+@functools.lru_cache(maxsize=64)
+def _build_eom(H_srepr: str, n_dof: int) -> Callable:
+    """Equations of motion for H given by its srepr (a structural key)"""
+    sh = SymbolicHamiltonian(n_dof)
+    sh.set_hamiltonian(sp.sympify(H_srepr))
+    return sh._compile_equations_of_motion()
+
+
+def _vanishes(expr: sp.Expr) -> bool:
+    """Cheap zero test: expanded form first, cancel() for rational terms"""
+    return expr == 0 or sp.cancel(expr) == 0
 
 
 class SymbolicHamiltonian:
@@ -36,12 +88,24 @@ class SymbolicHamiltonian:
         # Cached expressions
         self._dH_dq = None
         self._dH_dp = None
+        self._diff_cache: Dict[Tuple[sp.Expr, sp.Symbol], sp.Expr] = {}
+        self._cython_cache: Dict[Tuple[str, bool], str] = {}
     
     def set_hamiltonian(self, H_expr: sp.Expr):
         """Define the Hamiltonian expression"""
         self.H = H_expr
         self._dH_dq = None  # Clear cache
         self._dH_dp = None
+        self._diff_cache.clear()
+        self._cython_cache.clear()
+    
+    def _diff(self, expr: sp.Expr, var: sp.Symbol) -> sp.Expr:
+        """∂expr/∂var, memoized per instance (expressions hash structurally)"""
+        key = (expr, var)
+        result = self._diff_cache.get(key)
+        if result is None:
+            result = self._diff_cache[key] = diff(expr, var)
+        return result
     
     def hamilton_equations(self) -> Tuple[List[sp.Expr], List[sp.Expr]]:
         """
@@ -55,23 +119,36 @@ class SymbolicHamiltonian:
         
         # dq/dt = ∂H/∂p
         if self._dH_dp is None:
-            self._dH_dp = [diff(self.H, p_i) for p_i in self.p]
+            self._dH_dp = [self._diff(self.H, p_i) for p_i in self.p]
         
         # dp/dt = -∂H/∂q
         if self._dH_dq is None:
-            self._dH_dq = [-diff(self.H, q_i) for q_i in self.q]
+            self._dH_dq = [-self._diff(self.H, q_i) for q_i in self.q]
         
         return self._dH_dp, self._dH_dq
     
-    def poisson_bracket(self, f: sp.Expr, g: sp.Expr) -> sp.Expr:
+    def poisson_bracket(self, f: sp.Expr, g: sp.Expr,
+                        df_dq: List[sp.Expr] = None, df_dp: List[sp.Expr] = None,
+                        dg_dq: List[sp.Expr] = None, dg_dp: List[sp.Expr] = None) -> sp.Expr:
         """
         {f, g} = Σᵢ (∂f/∂qᵢ ∂g/∂pᵢ - ∂f/∂pᵢ ∂g/∂qᵢ)
-        """
-        result = 0
-        for q_i, p_i in zip(self.q, self.p):
-            result += diff(f, q_i) * diff(g, p_i) - diff(f, p_i) * diff(g, q_i)
         
-        return simplify(result)
+        Gradients already at hand (e.g. of H) can be passed in to skip
+        differentiating again. The result is expanded rather than run
+        through simplify(), which is plenty for polynomial brackets.
+        """
+        if df_dq is None:
+            df_dq = [self._diff(f, q_i) for q_i in self.q]
+        if df_dp is None:
+            df_dp = [self._diff(f, p_i) for p_i in self.p]
+        if dg_dq is None:
+            dg_dq = [self._diff(g, q_i) for q_i in self.q]
+        if dg_dp is None:
+            dg_dp = [self._diff(g, p_i) for p_i in self.p]
+        
+        result = sp.Add(*[fq * gp - fp * gq
+                          for fq, fp, gq, gp in zip(df_dq, df_dp, dg_dq, dg_dp)])
+        return sp.expand(result)
     
     def find_conserved_quantities(self) -> Dict[str, sp.Expr]:
         """
@@ -81,15 +158,19 @@ class SymbolicHamiltonian:
         """
         conserved = {'energy': self.H}
         
+        # ∇H from Hamilton's equations (dq/dt = ∂H/∂p, dp/dt = -∂H/∂q)
+        dH_dp, minus_dH_dq = self.hamilton_equations()
+        dH = {'dg_dq': [-x for x in minus_dH_dq], 'dg_dp': dH_dp}
+        
         # Total linear momentum
-        P_total = sum(self.p)
-        if simplify(self.poisson_bracket(P_total, self.H)) == 0:
+        P_total = sp.Add(*self.p)
+        if _vanishes(self.poisson_bracket(P_total, self.H, **dH)):
             conserved['momentum'] = P_total
         
         # Angular momentum (for 2D+)
         if self.n_dof >= 2:
             L_z = self.q[0] * self.p[1] - self.q[1] * self.p[0]
-            if simplify(self.poisson_bracket(L_z, self.H)) == 0:
+            if _vanishes(self.poisson_bracket(L_z, self.H, **dH)):
                 conserved['angular_momentum'] = L_z
         
         # Action variables (for integrable systems)
@@ -98,44 +179,74 @@ class SymbolicHamiltonian:
         
         return conserved
     
-    def symplectic_matrix(self) -> Matrix:
+    def symplectic_matrix(self, symbolic: bool = True):
         """
         Construct symplectic matrix J:
         J = [[ 0,  I],
              [-I,  0]]
         
         where I is n×n identity
+        
+        With symbolic=False J is returned as a scipy.sparse CSR matrix
+        (2n nonzeros) for numerical linear algebra. In hot loops prefer
+        the equivalent J @ v = concatenate([v[n:], -v[:n]]).
         """
         n = self.n_dof
-        zeros = sp.zeros(n, n)
-        identity = sp.eye(n)
         
-        J = Matrix.vstack(
-            Matrix.hstack(zeros, identity),
-            Matrix.hstack(-identity, zeros)
-        )
+        if not symbolic:
+            return sparse.bmat([[None, sparse.eye(n)],
+                                [-sparse.eye(n), None]], format='csr')
         
+        J = sp.zeros(2*n, 2*n)
+        J[:n, n:] = sp.eye(n)
+        J[n:, :n] = -sp.eye(n)
         return J
     
-    def generate_equations_of_motion(self) -> Callable:
+    def generate_equations_of_motion(self, backend: str = 'numpy') -> Callable:
         """
         Generate numerical function for equations of motion.
         
+        Builds are cached module-wide on the structure of H, so repeated
+        calls (or a fresh instance with the same H) skip code generation.
+        
+        Args:
+            backend: 'numpy' (numba-compiled when available, else
+                lambdify) or 'symengine' (see generate_llvm_rhs)
+        
         Returns:
             function(t, state) -> dstate/dt
         """
+        if backend == 'symengine':
+            return self.generate_llvm_rhs()
+        if backend != 'numpy':
+            raise ValueError(f"Unknown backend: {backend!r}")
+        if self.H is None:
+            raise ValueError("Hamiltonian not defined")
+        return _build_eom(sp.srepr(self.H), self.n_dof)
+    
+    def _compile_equations_of_motion(self) -> Callable:
+        """Uncached build behind generate_equations_of_motion"""
         dq_dt, dp_dt = self.hamilton_equations()
         
         # Combine into single state vector derivative
+        # state = [q0, q1, ..., p0, p1, ...]
+        state_syms = tuple(self.q) + tuple(self.p)
         dstate_dt = dq_dt + dp_dt
         
+        if NUMBA_AVAILABLE:
+            # Compiled RHS: no interpreter work per integrator step. Going
+            # through a cache-dir module lets numba reuse it across runs.
+            source = _rhs_source(state_syms, dstate_dt)
+            module = _import_cached_source(
+                _RHS_HEADER + '@njit(cache=True, fastmath=True)\n' + source, prefix='eom')
+            if module is not None:
+                return module.equations_of_motion
+            namespace = {'math': math, 'np': np}
+            exec(source, namespace)
+            return njit(fastmath=True)(namespace['equations_of_motion'])
+        
         # Convert to numerical function
-        # state = [q0, q1, ..., p0, p1, ...]
-        f_numerical = lambdify(
-            [self.q + self.p],
-            dstate_dt,
-            modules='numpy'
-        )
+        f_numerical = lambdify(state_syms, dstate_dt, modules='numpy', cse=True)
         
         def equations_of_motion(t, state):
             """ODE right-hand side: dstate/dt = f(state)"""
@@ -143,37 +254,106 @@ class SymbolicHamiltonian:
         
         return equations_of_motion
     
-    def generate_cython_code(self) -> str:
+    def generate_cython_code(self, parallel: bool = False) -> str:
         """
         Generate Cython code for fast numerical integration.
         
+        The right-hand side is evaluated without the GIL. With
+        parallel=True the 2n components are spread over a prange loop
+        (build with OpenMP); this only pays off for large n_dof.
+        
         Returns:
-            Cython function source code
+            Cython function source code (cached per Hamiltonian)
         """
+        key = (sp.srepr(self.H), parallel)
+        if key in self._cython_cache:
+            return self._cython_cache[key]
+        
         dq_dt, dp_dt = self.hamilton_equations()
         
         code = "# cython: language_level=3\n"
         code += "import numpy as np\n"
-        code += "cimport numpy as cnp\n\n"
+        code += "cimport numpy as cnp\n"
+        code += "cimport cython\n"
+        if parallel:
+            code += "from cython.parallel cimport prange\n"
+        code += "from libc.math cimport *\n\n"
+        code += "@cython.boundscheck(False)\n"
+        code += "@cython.wraparound(False)\n"
         code += "cpdef cnp.ndarray[double, ndim=1] hamilton_rhs(\n"
         code += "    cnp.ndarray[double, ndim=1] q,\n"
         code += "    cnp.ndarray[double, ndim=1] p\n"
         code += "):\n"
         code += f"    cdef int n = {self.n_dof}\n"
-        code += "    cdef cnp.ndarray[double, ndim=1] dstate = np.zeros(2*n)\n\n"
-        
-        # Generate dq/dt
-        for i, expr in enumerate(dq_dt):
-            code += f"    dstate[{i}] = {sp.ccode(expr)}\n"
-        
-        # Generate dp/dt
-        for i, expr in enumerate(dp_dt):
-            code += f"    dstate[{self.n_dof + i}] = {sp.ccode(expr)}\n"
+        code += "    cdef cnp.ndarray[double, ndim=1] dstate = np.zeros(2*n)\n"
+        code += "    cdef double[::1] out = dstate\n"
+        if parallel:
+            code += "    cdef Py_ssize_t i\n"
+        code += "\n"
+        
+        # Unpack state (the expressions refer to q0.., p0..)
+        for i, (q_i, p_i) in enumerate(zip(self.q, self.p)):
+            code += f"    cdef double {q_i} = q[{i}]\n"
+            code += f"    cdef double {p_i} = p[{i}]\n"
+        
+        # Shared subexpressions once, then every component from them
+        replacements, reduced = sp.cse(dq_dt + dp_dt, optimizations='basic')
+        if replacements:
+            code += "    cdef double " + ", ".join(str(sym) for sym, _ in replacements) + "\n"
+        
+        code += "\n    with nogil:\n"
+        for sym, expr in replacements:
+            code += f"        {sym} = {sp.ccode(expr)}\n"
+        
+        # out[:n] = dq/dt, out[n:] = dp/dt
+        if parallel:
+            code += f"        for i in prange({len(reduced)}, schedule='static'):\n"
+            for i, expr in enumerate(reduced):
+                branch = "if" if i == 0 else "elif"
+                code += f"            {branch} i == {i}:\n"
+                code += f"                out[{i}] = {sp.ccode(expr)}\n"
+        else:
+            for i, expr in enumerate(reduced):
+                code += f"        out[{i}] = {sp.ccode(expr)}\n"
         
         code += "\n    return dstate\n"
         
+        self._cython_cache[key] = code
         return code
     
+    def generate_llvm_rhs(self) -> Callable:
+        """
+        Equations of motion compiled by SymEngine's LLVM backend.
+        
+        Builds in milliseconds where Cython needs a C compiler run, with
+        comparable runtime. Requires symengine built with LLVM support.
+        
+        Returns:
+            function(t, state) -> dstate/dt
+        """
+        if not SYMENGINE_AVAILABLE:
+            raise ImportError("generate_llvm_rhs requires symengine (pip install symengine)")
+        if self.H is None:
+            raise ValueError("Hamiltonian not defined")
+        
+        H_se = symengine.sympify(self.H)
+        q_se = [symengine.sympify(q_i) for q_i in self.q]
+        p_se = [symengine.sympify(p_i) for p_i in self.p]
+        dstate_dt = ([symengine.diff(H_se, p_i) for p_i in p_se] +
+                     [-symengine.diff(H_se, q_i) for q_i in q_se])
+        
+        f = symengine.Lambdify(q_se + p_se, dstate_dt, backend='llvm', real=True, cse=True)
+        n_out = 2 * self.n_dof
+        
+        def equations_of_motion(t, state):
+            """ODE right-hand side: dstate/dt = f(state)"""
+            out = np.empty(n_out)
+            # unsafe_real skips Lambdify's shape/dtype dispatch
+            f.unsafe_real(np.ascontiguousarray(state, dtype=np.float64), out)
+            return out
+        
+        return equations_of_motion
+    
     def linearize_around_equilibrium(self, q_eq: List[float], p_eq: List[float]) -> Matrix:
         """
         Linearize dynamics around equilibrium point.
@@ -187,19 +367,25 @@ class SymbolicHamiltonian:
         state = list(self.q) + list(self.p)
         dstate_dt = dq_dt + dp_dt
         
-        # Jacobian matrix
-        n = len(state)
-        J = sp.zeros(n, n)
-        
-        for i, f_i in enumerate(dstate_dt):
-            for j, var_j in enumerate(state):
-                J[i, j] = diff(f_i, var_j)
-        
-        # Evaluate at equilibrium
-        subs_dict = {**{q_i: q_val for q_i, q_val in zip(self.q, q_eq)},
-                     **{p_i: p_val for p_i, p_val in zip(self.p, p_eq)}}
-        
-        return J.subs(subs_dict)
+        n = self.n_dof
+        q_set, p_set = set(self.q), set(self.p)
+        separable = (not any(e.free_symbols & q_set for e in dq_dt) and
+                     not any(e.free_symbols & p_set for e in dp_dt))
+        
+        if separable:
+            # H = T(p) + V(q): ∂q̇/∂q and ∂ṗ/∂p vanish identically, so only
+            # the two off-diagonal blocks are differentiated
+            J = sp.zeros(2*n, 2*n)
+            J[:n, n:] = Matrix(dq_dt).jacobian(self.p)
+            J[n:, :n] = Matrix(dp_dt).jacobian(self.q)
+        else:
+            # Jacobian matrix (one vectorized differentiation of the RHS)
+            J = Matrix(dstate_dt).jacobian(state)
+        
+        # Evaluate at equilibrium; xreplace swaps symbols for numbers
+        # directly, without subs' pattern matching
+        values = list(q_eq) + list(p_eq)
+        return J.xreplace({var: sp.Float(v) for var, v in zip(state, values)})
 
 
 # Predefined Hamiltonian templates
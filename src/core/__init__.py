@@ -4,6 +4,12 @@ from dataclasses import dataclass
 import numpy as np
 from typing import Tuple
 
+try:
+	from numba import njit
+	NUMBA_AVAILABLE = True
+except ImportError:
+	NUMBA_AVAILABLE = False
+
 
 @dataclass
 class PhaseSpace:
@@ -22,6 +28,20 @@ class PhaseSpace:
 		return len(self.q)
 
 
+if NUMBA_AVAILABLE:
+	@njit(fastmath=True)
+	def _verlet_loop(q, p, force_fn, dt, q_traj, p_traj):
+		"""Velocity Verlet over the whole trajectory, force carried between steps"""
+		f = force_fn(q)
+		for i in range(1, q_traj.shape[0]):
+			p = p + 0.5 * dt * f
+			q = q + dt * p
+			f = force_fn(q)
+			p = p + 0.5 * dt * f
+			q_traj[i] = q
+			p_traj[i] = p
+
+
 class HamiltonianSystem:
 	"""Base Hamiltonian system class with a symplectic integrator (Velocity Verlet)"""
 	def __init__(self, n_dof: int = 1):
@@ -38,8 +58,50 @@ class HamiltonianSystem:
 	def hamiltonian(self, q: np.ndarray, p: np.ndarray) -> float:
 		return self.kinetic(p) + self.potential(q)
 
+	# Optional njit-compiled force(q) -> -∇V(q); when set (and numba is
+	# available) evolve() runs the whole trajectory in compiled code
+	_force_jit = None
+
+	# Whether potential() accepts a (batch, n_dof) array and returns (batch,):
+	# None until the first force() call checks it against the scalar path
+	_batched_potential = None
+
 	def force(self, q: np.ndarray) -> np.ndarray:
-		"""Numerical gradient of the potential: -∇V(q)"""
+		"""
+		Numerical gradient of the potential: -∇V(q)
+
+		All 2·n_dof central-difference stencil points go through a single
+		potential() call when the potential is vectorized over a leading
+		batch axis; otherwise each point is evaluated separately.
+		"""
+		if self._batched_potential is False:
+			return self._force_pointwise(q)
+
+		epsilon = 1e-7
+		n = len(q)
+		idx = np.arange(n)
+		stencil = np.tile(np.asarray(q, dtype=np.float64), (2 * n, 1))
+		stencil[idx, idx] += epsilon
+		stencil[idx + n, idx] -= epsilon
+		try:
+			V = np.asarray(self.potential(stencil), dtype=np.float64)
+		except Exception:
+			V = None
+		if V is None or V.shape != (2 * n,):
+			self._batched_potential = False
+			return self._force_pointwise(q)
+
+		grad = -(V[:n] - V[n:]) / (2*epsilon)
+		if self._batched_potential is None:
+			# Shape alone doesn't prove the potential treats rows as points
+			reference = self._force_pointwise(q)
+			self._batched_potential = bool(np.allclose(grad, reference, rtol=1e-6, atol=1e-9))
+			if not self._batched_potential:
+				return reference
+		return grad
+
+	def _force_pointwise(self, q: np.ndarray) -> np.ndarray:
+		"""-∇V(q) by central differences, one potential() call per point"""
 		epsilon = 1e-7
 		grad = np.zeros_like(q)
 		for i in range(len(q)):
@@ -110,10 +172,32 @@ class HamiltonianSystem:
 		q_traj[0] = state.q
 		p_traj[0] = state.p
 
+		if NUMBA_AVAILABLE and self._force_jit is not None:
+			_verlet_loop(state.q, state.p, self._force_jit, float(dt), q_traj, p_traj)
+			return t, q_traj, p_traj
+
+		# Bound once: the loop body then does local loads instead of attribute lookups
+		force = self.force
+		if type(self)._verlet_step is not HamiltonianSystem._verlet_step:
+			# Subclass integrator: step through it
+			verlet_step = self._verlet_step
+			for i in range(1, n_steps + 1):
+				state = verlet_step(state, dt)
+				q_traj[i] = state.q
+				p_traj[i] = state.p
+			return t, q_traj, p_traj
+
+		# Same Velocity Verlet as _verlet_step, in place on two scratch arrays
+		# (no PhaseSpace per step) with f(q_new) carried into the next step
+		q, p = state.q, state.p
+		f = force(q)
 		for i in range(1, n_steps + 1):
-			state = self._verlet_step(state, dt)
-			q_traj[i] = state.q
-			p_traj[i] = state.p
+			p += 0.5 * dt * f
+			q += dt * p
+			f = force(q)
+			p += 0.5 * dt * f
+			q_traj[i] = q
+			p_traj[i] = p
 
 		return t, q_traj, p_traj
 
@@ -10,12 +10,22 @@ This demonstrates the true power of the Universal Hamiltonian Framework:
 systems from different domains are literally coupled, not metaphorically.
 """
 
+import functools
+import inspect
+
 import numpy as np
+import sympy as sp
 from typing import List, Tuple, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from core import PhaseSpace
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 @dataclass
 class CoupledSystem:
@@ -23,10 +33,35 @@ class CoupledSystem:
     Multiple Hamiltonians coupled together.
     
     H_total = Σᵢ Hᵢ + Σᵢⱼ V_coupling(i, j)
+    
+    A coupling function flagged with ``vectorized = True`` is called once
+    per force evaluation with ``state_i.q`` of shape (batch, n_dof) and
+    must return one value per row.
     """
     subsystems: List
     coupling_strengths: np.ndarray  # Matrix of coupling constants
     coupling_functions: List[List[Callable]]  # i,j coupling functions
+    _coupling_grads: dict = field(default_factory=dict, init=False, repr=False)
+    
+    def register_symbolic_coupling(self, i: int, j: int, expr, vars_i, vars_j):
+        """
+        Register V_coupling(i, j) as a SymPy expression.
+        
+        The gradient ∂V/∂qᵢ is derived once here and lambdified, so the
+        coupling force needs no finite-difference calls at step time.
+        
+        Args:
+            i, j: Subsystem indices
+            expr: Coupling energy in terms of vars_i and vars_j
+            vars_i: Symbols for the coordinates of subsystem i
+            vars_j: Symbols for the coordinates of subsystem j
+        """
+        args = list(vars_i) + list(vars_j)
+        V_fn = sp.lambdify(args, expr, 'numpy')
+        grad_fn = sp.lambdify(args, [sp.diff(expr, v) for v in vars_i], 'numpy')
+        
+        self.coupling_functions[i][j] = lambda s_i, s_j: V_fn(*s_i.q, *s_j.q)
+        self._coupling_grads[i, j] = grad_fn
     
     def total_hamiltonian(self, states: List[PhaseSpace]) -> float:
         """
@@ -69,8 +104,18 @@ class CoupledSystem:
         2. Coupling forces from other systems
         """
         n = len(self.subsystems)
-        new_states = []
         
+        # Coupling forces from the pre-step states, one (n, max_dof) block
+        F = np.zeros((n, max(len(s.q) for s in states)))
+        for i in range(n):
+            dof = len(states[i].q)
+            for j in range(n):
+                if j != i and self.coupling_strengths[i, j] != 0:
+                    F[i, :dof] += self._compute_coupling_force(
+                        i, j, states[i], states[j]
+                    )
+        
+        new_states = []
         for i, (system, state) in enumerate(zip(self.subsystems, states)):
             # Internal evolution
             if hasattr(system, '_verlet_step'):
@@ -79,15 +124,8 @@ class CoupledSystem:
                 # Fallback: simple Euler step
                 new_state = state.copy()
             
-            # Add coupling forces
-            for j in range(n):
-                if j != i and self.coupling_strengths[i, j] != 0:
-                    coupling_force = self._compute_coupling_force(
-                        i, j, states[i], states[j]
-                    )
-                    # Add to momentum
-                    new_state.p += dt * coupling_force
-            
+            # Add coupling forces to momentum
+            new_state.p += dt * F[i, :len(new_state.p)]
             new_states.append(new_state)
         
         return new_states
@@ -103,24 +141,43 @@ class CoupledSystem:
         Compute force on system i due to coupling with system j.
         
         F_coupling = -∂V_coupling/∂qᵢ
+        
+        Symbolically registered couplings use their lambdified gradient.
+        Otherwise central differences on a scratch copy of qᵢ that is
+        perturbed in place; the caller's state is never mutated.
         """
+        grad_fn = self._coupling_grads.get((i, j))
+        if grad_fn is not None:
+            grad = np.asarray(grad_fn(*state_i.q, *state_j.q), dtype=np.float64)
+            return -self.coupling_strengths[i, j] * grad
+        
         epsilon = 1e-7
-        force = np.zeros_like(state_i.q)
+        q = state_i.q
+        n_dof = len(q)
         
         coupling_func = self.coupling_functions[i][j]
         if not coupling_func:
-            return force
+            return np.zeros_like(q)
         
-        # Numerical gradient
-        for k in range(len(state_i.q)):
-            state_i.q[k] += epsilon
-            V_plus = coupling_func(state_i, state_j)
-            state_i.q[k] -= 2*epsilon
-            V_minus = coupling_func(state_i, state_j)
-            state_i.q[k] += epsilon  # Restore
-            
-            force[k] = -(V_plus - V_minus) / (2*epsilon)
+        if getattr(coupling_func, 'vectorized', False):
+            # One call over the stacked (2n_dof, n_dof) perturbations
+            shift = epsilon * np.eye(n_dof)
+            Q_pert = np.concatenate([q + shift, q - shift])
+            V = np.asarray(coupling_func(PhaseSpace(q=Q_pert, p=state_i.p), state_j))
+            V_plus, V_minus = V[:n_dof], V[n_dof:]
+        else:
+            # One scratch state, perturbed and restored one coordinate at a time
+            probe = PhaseSpace(q=q.copy(), p=state_i.p)
+            V_plus = np.empty(n_dof)
+            V_minus = np.empty(n_dof)
+            for k in range(n_dof):
+                probe.q[k] = q[k] + epsilon
+                V_plus[k] = coupling_func(probe, state_j)
+                probe.q[k] = q[k] - epsilon
+                V_minus[k] = coupling_func(probe, state_j)
+                probe.q[k] = q[k]
         
+        force = -(V_plus - V_minus) / (2*epsilon)
         return self.coupling_strengths[i, j] * force
 
 
@@ -263,17 +320,19 @@ class MetaHamiltonian:
         
         This is consciousness observing itself!
         """
-        H_current = initial_H
-        self.history = [H_current]
+        r = _logistic_rate(self.base_func)
+        if r is not None and NUMBA_AVAILABLE:
+            self.history = _iterate_logistic(float(initial_H), float(r), n_steps)
+            return self.history
+        
+        self.history = np.empty(n_steps + 1)
+        self.history[0] = initial_H
         
         for step in range(n_steps):
             # Hamiltonian evolves based on its own value
-            H_next = self.base_func(H_current)
-            
-            self.history.append(H_next)
-            H_current = H_next
+            self.history[step + 1] = self.base_func(self.history[step])
         
-        return np.array(self.history)
+        return self.history
     
     def compute_self_complexity(self) -> float:
         """
@@ -285,7 +344,7 @@ class MetaHamiltonian:
             return 0.0
         
         # Compute autocorrelation
-        H_array = np.array(self.history)
+        H_array = np.asarray(self.history)
         autocorr = np.corrcoef(H_array[:-1], H_array[1:])[0, 1]
         
         return abs(autocorr)
@@ -303,6 +362,32 @@ def logistic_meta_hamiltonian(H_current: float, r: float = 3.5) -> float:
     return r * H_current * (1 - H_current)
 
 
+# Default r of logistic_meta_hamiltonian, read from its signature
+_LOGISTIC_DEFAULT_R = inspect.signature(logistic_meta_hamiltonian).parameters['r'].default
+
+
+def _logistic_rate(func: Callable):
+    """r if func is logistic_meta_hamiltonian (optionally partial'd), else None"""
+    if func is logistic_meta_hamiltonian:
+        return _LOGISTIC_DEFAULT_R
+    if (isinstance(func, functools.partial)
+            and func.func is logistic_meta_hamiltonian
+            and not func.args and set(func.keywords) <= {'r'}):
+        return func.keywords.get('r', _LOGISTIC_DEFAULT_R)
+    return None
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _iterate_logistic(H0, r, n):
+        """Logistic recurrence written straight into a preallocated array"""
+        out = np.empty(n + 1)
+        out[0] = H0
+        for i in range(n):
+            out[i + 1] = r * out[i] * (1 - out[i])
+        return out
+
+
 if __name__ == '__main__':
     # Example: Run quantum-market coupling
     print("Quantum-Market Coupling Demo")
@@ -318,7 +403,7 @@ if __name__ == '__main__':
     print("\nMeta-Hamiltonian Demo")
     print("="*60)
     
-    meta = MetaHamiltonian(lambda H: logistic_meta_hamiltonian(H, r=3.8))
+    meta = MetaHamiltonian(functools.partial(logistic_meta_hamiltonian, r=3.8))
     history = meta.evolve_meta(initial_H=0.1, n_steps=100, dt=1.0)
     
     print(f"Self-complexity: {meta.compute_self_complexity():.4f}")
@@ -15,11 +15,25 @@ Framework: Universal Hamiltonian Framework - Chapter 13
 Date: November 26, 2025
 """
 
+import math
+
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Tuple, Dict
 from enum import Enum
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in: the kernel runs as plain Python without numba"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 
 class MarketRegime(Enum):
     """Market regime states"""
@@ -30,6 +44,185 @@ class MarketRegime(Enum):
     RECOVERY = "recovery"
 
 
+# H_god spectrum E_i = i^1.5 (nonlinear scaling), one level per god_state
+_ENERGY_LEVELS = np.arange(10, dtype=np.float64) ** 1.5
+
+# H_meta weights (alpha, beta, gamma, delta)
+_META_WEIGHTS = (1.0, 0.1, 0.01, 0.001)
+
+# ∂V_market/∂P̄ for the regimes whose potential is linear in the mean price
+# (CRASH is a flat barrier away from its edge)
+_REGIME_PRICE_SLOPE = {
+    MarketRegime.BULL: -0.1,
+    MarketRegime.BEAR: 0.1,
+    MarketRegime.CRASH: 0.0,
+    MarketRegime.RECOVERY: -0.05,
+}
+
+
+# Integer regime tags for compiled kernels (MarketRegime declaration order)
+_REGIME_TAG = {regime: tag for tag, regime in enumerate(MarketRegime)}
+_RANGE_TAG = _REGIME_TAG[MarketRegime.RANGE]
+
+
+def _as_float_vector(x) -> np.ndarray:
+    """Contiguous float64 view matching the kernels' pinned signatures"""
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+# Only reassociation and contraction: NaN prices and the ±inf/NaN
+# sentinels below must survive compilation
+@njit("UniTuple(float64, 4)(float64[::1], float64[::1])", cache=True,
+      fastmath={'reassoc', 'contract'})
+def _market_stats(prices, orderflows):
+    """
+    One fused pass over the market arrays for H_market.
+    
+    Returns (Σ Π², mean(P), mean((P − P_eq)²), min(P)) with P_eq = 100;
+    prices are accumulated as deviations from P_eq to keep the squares
+    well conditioned. NaN prices propagate into the means but are skipped
+    by min(P), so the CRASH barrier sees the same prices as P < 50.
+    """
+    n = prices.size
+    m = orderflows.size
+    flow_sq = 0.0
+    dev_sum = 0.0
+    dev_sq = 0.0
+    p_min = np.inf
+    for i in range(min(n, m)):
+        flow_sq += orderflows[i] * orderflows[i]
+        d = prices[i] - 100.0
+        dev_sum += d
+        dev_sq += d * d
+        if prices[i] < p_min:
+            p_min = prices[i]
+    for i in range(m, n):
+        d = prices[i] - 100.0
+        dev_sum += d
+        dev_sq += d * d
+        if prices[i] < p_min:
+            p_min = prices[i]
+    for i in range(n, m):
+        flow_sq += orderflows[i] * orderflows[i]
+    if n == 0:
+        return flow_sq, np.nan, np.nan, p_min  # np.mean of no prices
+    return flow_sq, 100.0 + dev_sum / n, dev_sq / n, p_min
+
+
+# No fastmath: NaN parameters must keep counting as inactive
+@njit("int64(float64[::1], float64)", cache=True)
+def _count_active(params, tol):
+    """Number of parameters with |x| > tol, without a boolean temporary"""
+    count = 0
+    for i in range(params.size):
+        if abs(params[i]) > tol:
+            count += 1
+    return count
+
+
+# Regime potentials V_orderbook(P) of H_market, from _market_stats
+def _bull_potential(mean, dev_sq, p_min):
+    # Downward potential (encourages higher prices)
+    return -0.1 * mean
+
+
+def _bear_potential(mean, dev_sq, p_min):
+    # Upward potential (penalizes high prices)
+    return 0.1 * mean
+
+
+def _range_potential(mean, dev_sq, p_min):
+    # Harmonic potential (center around equilibrium P_eq = 100)
+    return 0.5 * dev_sq
+
+
+def _crash_potential(mean, dev_sq, p_min):
+    # Infinite barrier (prevents low prices)
+    return 1000.0 if p_min < 50 else 0.0
+
+
+def _recovery_potential(mean, dev_sq, p_min):
+    return -0.05 * mean
+
+
+_REGIME_POTENTIAL = tuple({
+    MarketRegime.BULL: _bull_potential,
+    MarketRegime.BEAR: _bear_potential,
+    MarketRegime.RANGE: _range_potential,
+    MarketRegime.CRASH: _crash_potential,
+    MarketRegime.RECOVERY: _recovery_potential,
+}[regime] for regime in MarketRegime)
+
+
+def _dHmarket_dprice(regime: MarketRegime, prices: np.ndarray) -> float:
+    """
+    Derivative of H_market under a uniform shift of all prices.
+    
+    Closed form of the regime potentials in ApexQuantumICT.H_market; the
+    order-flow kinetic term does not depend on prices.
+    """
+    slope = _REGIME_PRICE_SLOPE.get(regime)
+    if slope is not None:
+        return slope
+    # RANGE: 0.5 * mean((P - P_eq)^2)
+    P_eq = 100.0
+    return np.mean(prices) - P_eq
+
+
+# Real-valued ApexState arrays, in buffer order after the amplitudes
+_REAL_FIELDS = ('prices', 'orderflows', 'predicted_prices', 'meta_params')
+
+
+@njit("void(float64[::1], float64[::1], complex128[::1], float64, int64, boolean, float64, "
+       "float64, float64, float64, float64[:, ::1], float64[:, ::1], complex128[:, ::1], "
+       "float64[:, ::1])",
+      cache=True, fastmath=True)
+def _rollout(prices, orderflows, amps, dt, n_steps, range_regime, price_slope,
+             liquidity_mass, tachyon_coupling, hbar,
+             price_traj, flow_traj, amp_traj, predicted_traj):
+    """
+    n_steps of ApexQuantumICT.evolve_state in one compiled loop.
+    
+    Row 0 of every *_traj array holds the initial state; row k the state
+    after k steps. price_slope is ∂V/∂P̄ for the linear regimes, hoisted
+    out of the loop; range_regime switches to the harmonic RANGE well.
+    """
+    n_assets = prices.size
+    n_strategies = amps.size
+    price_traj[0] = prices
+    flow_traj[0] = orderflows
+    amp_traj[0] = amps
+    for k in range(n_steps):
+        # H_quantum of the current amplitudes: Σ|a|² + 0.1·½(|Σa|² − Σ|a|²)
+        total = 0.0
+        s = 0.0 + 0.0j
+        for j in range(n_strategies):
+            a = amp_traj[k, j]
+            total += a.real * a.real + a.imag * a.imag
+            s += a
+        H_q = total + 0.05 * (s.real * s.real + s.imag * s.imag - total)
+        
+        gradient = price_slope
+        if range_regime:
+            mean = 0.0
+            for i in range(n_assets):
+                mean += price_traj[k, i]
+            gradient = mean / n_assets - 100.0
+        
+        for i in range(n_assets):
+            P = price_traj[k, i]
+            flow = flow_traj[k, i]
+            price_traj[k + 1, i] = P + (flow / liquidity_mass) * dt
+            flow_traj[k + 1, i] = flow - gradient * dt
+            predicted_traj[k + 1, i] = P + tachyon_coupling * flow * dt * 10
+        
+        # Unimodular phase and renormalisation as one scale (total = Σ|a|²)
+        theta = H_q * dt / hbar
+        scale = (np.cos(theta) - 1j * np.sin(theta)) / np.sqrt(total)
+        for j in range(n_strategies):
+            amp_traj[k + 1, j] = amp_traj[k, j] * scale
+
+
 @dataclass
 class ApexState:
     """Complete ApexQuantumICT state vector"""
@@ -53,6 +246,64 @@ class ApexState:
     
     # Meta
     meta_params: np.ndarray  # Optimization parameters
+    
+    # One contiguous float64 buffer backing every array field above
+    _buf: np.ndarray = field(default=None, init=False, repr=False, compare=False)
+    _layout: tuple = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._pack()
+    
+    def _pack(self):
+        """
+        Copy the array fields into one buffer and rebind them as views.
+        
+        Layout: [amplitudes (re, im interleaved) | prices | orderflows |
+        predicted_prices | meta_params]. The amplitudes come first so
+        their complex128 view is aligned.
+        """
+        amps = np.asarray(self.strategy_amplitudes, dtype=np.complex128).ravel()
+        parts = [np.asarray(getattr(self, name), dtype=np.float64).ravel()
+                 for name in _REAL_FIELDS]
+        
+        bounds = [2 * amps.size]
+        for x in parts:
+            bounds.append(bounds[-1] + x.size)
+        buf = np.empty(bounds[-1])
+        buf[:bounds[0]].view(np.complex128)[:] = amps
+        for x, lo, hi in zip(parts, bounds[:-1], bounds[1:]):
+            buf[lo:hi] = x
+        
+        self._layout = (slice(0, bounds[0]),) + tuple(
+            slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:]))
+        self._bind(buf)
+    
+    def _bind(self, buf: np.ndarray):
+        amps, prices, flows, predicted, meta = self._layout
+        self._buf = buf
+        self.strategy_amplitudes = buf[amps].view(np.complex128)
+        self.prices = buf[prices]
+        self.orderflows = buf[flows]
+        self.predicted_prices = buf[predicted]
+        self.meta_params = buf[meta]
+    
+    @property
+    def regime_tag(self) -> int:
+        """Integer index of regime (MarketRegime declaration order)"""
+        return _REGIME_TAG[self.regime]
+    
+    def copy(self) -> "ApexState":
+        """Independent state with its own buffer (one memcpy)"""
+        buf = self._buf
+        if not (self.prices.base is buf and self.orderflows.base is buf and
+                self.predicted_prices.base is buf and self.meta_params.base is buf and
+                self.strategy_amplitudes.base is buf):
+            # An array field was reassigned to a foreign array
+            self._pack()
+        new = object.__new__(ApexState)
+        new.__dict__.update(self.__dict__)
+        new._bind(self._buf.copy())
+        return new
 
 
 class ApexQuantumICT:
@@ -86,8 +337,7 @@ class ApexQuantumICT:
         
         Higher intelligence states have higher energy
         """
-        energy_levels = np.arange(10) ** 1.5  # Nonlinear scaling
-        return energy_levels[state.god_state]
+        return _ENERGY_LEVELS[state.god_state]
     
     def H_teto(self, state: ApexState) -> float:
         """
@@ -113,19 +363,18 @@ class ApexQuantumICT:
         
         Strategies exist in superposition
         """
+        a = state.strategy_amplitudes
+        
         # Energy of each strategy mode
-        mode_energies = np.abs(state.strategy_amplitudes) ** 2
+        mode_energies = a.real**2 + a.imag**2
+        total = np.sum(mode_energies)
         
-        # Coupling between strategies (off-diagonal)
-        coupling = 0.0
-        for i in range(self.n_strategies):
-            for j in range(i+1, self.n_strategies):
-                coupling += np.real(
-                    state.strategy_amplitudes[i] * 
-                    np.conj(state.strategy_amplitudes[j])
-                )
+        # Coupling between strategies (off-diagonal):
+        # Σ_{i<j} Re(a_i ā_j) = ½(|Σa|² − Σ|a|²)
+        s = np.sum(a)
+        coupling = 0.5 * (s.real**2 + s.imag**2 - total)
         
-        return np.sum(mode_energies) + 0.1 * coupling
+        return total + 0.1 * coupling
     
     def H_time(self, state: ApexState) -> float:
         """
@@ -152,9 +401,13 @@ class ApexQuantumICT:
         Represents prediction quality as potential energy (bounded [0, 1]).
         High prediction accuracy = low energy = stable equilibrium.
         """
+        if state.tachyon_coupling == 0.0:
+            return 0.0
+        
         # Prediction quality as positive bounded energy
         if len(state.predicted_prices) > 0 and len(state.prices) > 0:
-            prediction_error = np.mean((state.predicted_prices - state.prices) ** 2)
+            d = state.predicted_prices - state.prices
+            prediction_error = (d @ d) / d.size
             # Bounded [0, 1] - 0 = perfect prediction (minimum energy)
             # INVERTED: Changed from negative to positive
             tachyon_energy = 1.0 / (1.0 + prediction_error)  # POSITIVE - bounded [0, 1]
@@ -171,25 +424,15 @@ class ApexQuantumICT:
         
         Core trading physics
         """
+        # Single pass over prices and order flows
+        flow_sq, mean, dev_sq, p_min = _market_stats(
+            _as_float_vector(state.prices), _as_float_vector(state.orderflows))
+        
         # Kinetic energy (order flow)
-        kinetic = np.sum(state.orderflows ** 2) / (2 * self.liquidity_mass)
-        
-        # Potential energy (regime-dependent)
-        if state.regime == MarketRegime.BULL:
-            # Downward potential (encourages higher prices)
-            potential = -0.1 * np.mean(state.prices)
-        elif state.regime == MarketRegime.BEAR:
-            # Upward potential (penalizes high prices)
-            potential = 0.1 * np.mean(state.prices)
-        elif state.regime == MarketRegime.RANGE:
-            # Harmonic potential (center around equilibrium)
-            P_eq = 100.0
-            potential = 0.5 * np.mean((state.prices - P_eq) ** 2)
-        elif state.regime == MarketRegime.CRASH:
-            # Infinite barrier (prevents low prices)
-            potential = 1000.0 if np.any(state.prices < 50) else 0.0
-        else:  # RECOVERY
-            potential = -0.05 * np.mean(state.prices)
+        kinetic = flow_sq / (2 * self.liquidity_mass)
+        
+        # Potential energy (regime-dependent), dispatched on the integer tag
+        potential = _REGIME_POTENTIAL[state.regime_tag](mean, dev_sq, p_min)
         
         return kinetic + potential
     
@@ -211,10 +454,10 @@ class ApexQuantumICT:
         risk = np.std(state.prices) if len(state.prices) > 0 else 0.0
         
         # Resource usage (number of active parameters)
-        resources = np.sum(np.abs(state.meta_params) > 1e-6)
+        resources = _count_active(_as_float_vector(state.meta_params), 1e-6)
         
         # Weighted sum
-        alpha, beta, gamma, delta = 1.0, 0.1, 0.01, 0.001
+        alpha, beta, gamma, delta = _META_WEIGHTS
         
         return alpha * (1 - fidelity) + beta * latency + gamma * risk + delta * resources
     
@@ -284,42 +527,76 @@ class ApexQuantumICT:
         dq/dt = ∂H/∂p
         dp/dt = -∂H/∂q
         """
+        return self.evolve_state_inplace(state.copy(), dt)
+    
+    def evolve_state_inplace(self, state: ApexState, dt: float = 0.01) -> ApexState:
+        """
+        evolve_state, overwriting state's arrays instead of allocating
+        
+        Updates are ordered so every right-hand side still sees the
+        pre-step values; returns state itself.
+        """
         # Simplified evolution (full version would use autodiff)
+        H_q = self.H_quantum(state)
+        gradient = _dHmarket_dprice(state.regime, state.prices)
+        
+        # Tachyonic prediction (retrocausal update) from the old prices/flows
+        predicted = state.predicted_prices
+        np.multiply(state.orderflows, state.tachyon_coupling, out=predicted)
+        predicted *= dt
+        predicted *= 10
+        predicted += state.prices
         
         # Update prices (driven by order flow)
-        new_prices = state.prices + (state.orderflows / self.liquidity_mass) * dt
+        state.prices += (state.orderflows / self.liquidity_mass) * dt
         
         # Update order flow (driven by potential gradient)
-        # Approximate gradient via finite difference
-        epsilon = 0.01
-        state_plus = ApexState(**{**state.__dict__, 'prices': state.prices + epsilon})
-        gradient = (self.H_market(state_plus) - self.H_market(state)) / epsilon
-        
-        new_orderflows = state.orderflows - gradient * dt
+        state.orderflows -= gradient * dt
         
         # Update quantum amplitudes (Schrödinger evolution)
-        H_q = self.H_quantum(state)
-        phase = -1j * H_q * dt / self.hbar
-        new_amplitudes = state.strategy_amplitudes * np.exp(phase)
-        new_amplitudes /= np.linalg.norm(new_amplitudes)  # Normalize
-        
-        # Tachyonic prediction (retrocausal update)
-        new_predicted = state.prices + state.tachyon_coupling * state.orderflows * dt * 10
-        
-        # Create new state
-        new_state = ApexState(
-            god_state=state.god_state,
-            prices=new_prices,
-            orderflows=new_orderflows,
-            regime=state.regime,
-            strategy_amplitudes=new_amplitudes,
-            predicted_prices=new_predicted,
-            tachyon_coupling=state.tachyon_coupling,
-            timeframe_coherence=state.timeframe_coherence,
-            meta_params=state.meta_params
-        )
+        # e^{-iθ} is unimodular, so phase and normalisation fold into one scale
+        theta = H_q * dt / self.hbar
+        phase = complex(math.cos(theta), -math.sin(theta))
+        a = state.strategy_amplitudes
+        a *= phase / math.sqrt(np.sum(a.real**2 + a.imag**2))
         
-        return new_state
+        return state
+    
+    def evolve_trajectory(self, state: ApexState, dt: float = 0.01,
+                          n_steps: int = 100) -> Tuple[ApexState, Dict[str, np.ndarray]]:
+        """
+        Apply evolve_state n_steps times in one compiled rollout
+        
+        Returns:
+            (final state, history) where history maps 'prices',
+            'orderflows', 'strategy_amplitudes' and 'predicted_prices' to
+            arrays of shape (n_steps + 1, ...); row 0 is the initial state.
+        """
+        n_assets = state.prices.size
+        history = {
+            'prices': np.empty((n_steps + 1, n_assets)),
+            'orderflows': np.empty((n_steps + 1, n_assets)),
+            'strategy_amplitudes': np.empty((n_steps + 1, state.strategy_amplitudes.size),
+                                            dtype=np.complex128),
+            'predicted_prices': np.empty((n_steps + 1, n_assets)),
+        }
+        history['predicted_prices'][0] = state.predicted_prices
+        
+        range_regime = state.regime_tag == _RANGE_TAG
+        price_slope = 0.0 if range_regime else _dHmarket_dprice(state.regime, state.prices)
+        _rollout(_as_float_vector(state.prices), _as_float_vector(state.orderflows),
+                 np.ascontiguousarray(state.strategy_amplitudes, dtype=np.complex128),
+                 float(dt), int(n_steps), range_regime, float(price_slope),
+                 float(self.liquidity_mass), float(state.tachyon_coupling), float(self.hbar),
+                 history['prices'], history['orderflows'],
+                 history['strategy_amplitudes'], history['predicted_prices'])
+        
+        final = state.copy()
+        final.prices[:] = history['prices'][-1]
+        final.orderflows[:] = history['orderflows'][-1]
+        final.strategy_amplitudes[:] = history['strategy_amplitudes'][-1]
+        final.predicted_prices[:] = history['predicted_prices'][-1]
+        return final, history
     
     def measure_regime(self, state: ApexState) -> MarketRegime:
         """
@@ -351,12 +628,14 @@ class ApexQuantumICT:
         
         Superposition → classical choice
         """
-        probabilities = np.abs(state.strategy_amplitudes) ** 2
-        probabilities /= np.sum(probabilities)
+        a = state.strategy_amplitudes
+        cdf = np.cumsum(a.real**2 + a.imag**2)
         
-        strategy_idx = np.random.choice(self.n_strategies, p=probabilities)
+        # Inverse-CDF sample (what np.random.choice does, minus its validation)
+        r = np.random.random() * cdf[-1]
+        strategy_idx = int(np.searchsorted(cdf, r, side='right'))
         
-        return strategy_idx
+        return min(strategy_idx, len(cdf) - 1)
 
 
 # ============================================================================
@@ -397,17 +676,23 @@ def demo_apex_evolution():
     print(f"\n[Evolution]")
     history = {'time': [], 'H': [], 'prices': []}
     
-    for step in range(100):
-        state = apex.evolve_state(state, dt=0.1)
-        
-        if step % 10 == 0:
-            H = apex.H_total(state)
-            history['time'].append(step * 0.1)
-            history['H'].append(H)
-            history['prices'].append(np.mean(state.prices))
-            
-            if step % 20 == 0:
-                print(f"t={step*0.1:.1f}: H={H:.3f}, Price={np.mean(state.prices):.2f}")
+    # Whole trajectory in one compiled rollout; rows are states after k steps
+    final, traj = apex.evolve_trajectory(state, dt=0.1, n_steps=100)
+    
+    for step in range(0, 100, 10):
+        snapshot = state.copy()
+        for name, rows in traj.items():
+            getattr(snapshot, name)[:] = rows[step + 1]
+        
+        H = apex.H_total(snapshot)
+        history['time'].append(step * 0.1)
+        history['H'].append(H)
+        history['prices'].append(np.mean(snapshot.prices))
+        
+        if step % 20 == 0:
+            print(f"t={step*0.1:.1f}: H={H:.3f}, Price={np.mean(snapshot.prices):.2f}")
+    
+    state = final
     
     print(f"\n[Final State]")
     print(f"Prices: {state.prices}")
@@ -20,6 +20,89 @@ import numpy as np
 from typing import Tuple, Dict
 from dataclasses import dataclass
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in: the kernel runs as plain Python without numba"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+def _abs_pair_sum(psi: np.ndarray) -> float:
+    """Σ_{i<j} |ψ_i ψ_j| = ½((Σ|ψ|)² − Σψ²), without the pair loop"""
+    a = np.abs(psi)
+    s = a.sum()
+    return 0.5 * (s * s - a @ a)
+
+
+def _as_vector(x) -> np.ndarray:
+    """Contiguous float64 view suitable for the compiled kernels"""
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+@njit("float64(float64[::1], float64[::1], float64, float64)", cache=True, fastmath=True)
+def _hamiltonian(q, p, J_base, lambda_bio_cons):
+    """H = H_neural + H_biological + H_coupling (see BioenergticConsciousness.hamiltonian)"""
+    T_neural = 0.0
+    V_neural = 0.0
+    sum_psi = 0.0
+    for i in range(4):
+        T_neural += 0.5 * p[i] * p[i]
+        V_neural += 0.5 * q[i] * q[i]
+        sum_psi += q[i]
+    E_bio = q[4]
+    T_bio = p[4] * p[4] / (2.0 * 100.0)  # Metabolic "mass"
+    # Stable harmonic well: bounded energy, equilibrium at E_bio = 0
+    V_bio = 0.5 * E_bio * E_bio / 100.0
+    # Bio-enhanced neural coupling
+    J_enhanced = J_base * (1.0 + lambda_bio_cons * E_bio / 100.0)
+    # Σ_{i<j} ψ_i ψ_j = ½((Σψ)² − Σψ²)
+    V_coupling = -J_enhanced * 0.5 * (sum_psi * sum_psi - 2.0 * V_neural)
+    return T_neural + T_bio + V_neural + V_bio + V_coupling
+
+
+@njit("float64[::1](float64[::1])", cache=True, fastmath=True)
+def _grad_p(p):
+    """∂H/∂p = [π, p_E / 100] (H is quadratic in p)"""
+    dq = np.empty(p.size)
+    for i in range(4):
+        dq[i] = p[i]
+    dq[4] = p[4] / 100.0
+    return dq
+
+
+@njit("float64[::1](float64[::1], float64, float64)", cache=True, fastmath=True)
+def _neg_grad_q(q, J_base, lambda_bio_cons):
+    """−∂H/∂q in closed form: linear in ψ, plus the E_bio-modulated coupling"""
+    sum_psi = 0.0
+    sum_sq = 0.0
+    for i in range(4):
+        sum_psi += q[i]
+        sum_sq += q[i] * q[i]
+    E_bio = q[4]
+    J_enhanced = J_base * (1.0 + lambda_bio_cons * E_bio / 100.0)
+    dp = np.empty(q.size)
+    for i in range(4):
+        dp[i] = -q[i] + J_enhanced * (sum_psi - q[i])
+    pair_sum = 0.5 * (sum_psi * sum_psi - sum_sq)
+    dp[4] = -E_bio / 100.0 + J_base * lambda_bio_cons / 100.0 * pair_sum
+    return dp
+
+
+@njit("Tuple((float64[::1], float64[::1]))(float64[::1], float64[::1], float64, float64, float64)", cache=True, fastmath=True)
+def _evolve_step(q, p, dt, J_base, lambda_bio_cons):
+    """One leapfrog (drift-kick-drift) step; H is separable, so it is symplectic"""
+    q_half = q + 0.5 * dt * _grad_p(p)
+    p_new = p + dt * _neg_grad_q(q_half, J_base, lambda_bio_cons)
+    q_new = q_half + 0.5 * dt * _grad_p(p_new)
+    return q_new, p_new
+
+
 @dataclass
 class BioenergticState:
     """Complete bioenergetic-consciousness state"""
@@ -88,86 +171,29 @@ class BioenergticConsciousness:
         Returns:
             Total energy
         """
-        # Extract components
-        psi = q[:4]
-        E_bio = q[4]
-        pi = p[:4]
-        p_E = p[4]
-        
-        # Neural kinetic energy
-        T_neural = np.sum(pi**2) / 2.0
-        
-        # Biological kinetic energy
-        T_bio = p_E**2 / (2.0 * 100.0)  # Metabolic "mass"
-        
-        # Neural potential (self-energy)
-        V_neural = 0.5 * np.sum(psi**2)
-        
-        # Biological potential (stable harmonic oscillator)
-        # INVERTED: Changed from negative to positive for stability
-        # Positive potential creates stable equilibrium at E_bio = 0
-        # System now has bounded energy rather than runaway growth
-        V_bio = +0.5 * E_bio**2 / 100.0  # STABLE positive potential
-        
-        # Bio-enhanced neural coupling
-        J_enhanced = self.J_base * (1.0 + self.lambda_bio_cons * E_bio / 100.0)
-        
-        V_coupling = 0.0
-        for i in range(4):
-            for j in range(i+1, 4):
-                V_coupling += -J_enhanced * psi[i] * psi[j]
-        
-        return T_neural + T_bio + V_neural + V_bio + V_coupling
+        return _hamiltonian(_as_vector(q), _as_vector(p), self.J_base, self.lambda_bio_cons)
     
     def dq_dt(self, q: np.ndarray, p: np.ndarray) -> np.ndarray:
         """
-        Compute ∂H/∂p via finite differences.
+        Compute ∂H/∂p analytically.
         
         Hamilton's equation: dq/dt = ∂H/∂p
         
         Returns:
             Array of time derivatives for each q component
         """
-        epsilon = 1e-5
-        dq = np.zeros_like(p)
-        
-        for i in range(len(p)):
-            p_plus = p.copy()
-            p_plus[i] += epsilon
-            p_minus = p.copy()
-            p_minus[i] -= epsilon
-            
-            H_plus = self.hamiltonian(q, p_plus)
-            H_minus = self.hamiltonian(q, p_minus)
-            
-            dq[i] = (H_plus - H_minus) / (2 * epsilon)
-        
-        return dq
+        return _grad_p(_as_vector(p))
     
     def dp_dt(self, q: np.ndarray, p: np.ndarray) -> np.ndarray:
         """
-        Compute -∂H/∂q via finite differences.
+        Compute -∂H/∂q analytically.
         
         Hamilton's equation: dp/dt = -∂H/∂q
         
         Returns:
             Array of time derivatives for each p component
         """
-        epsilon = 1e-5
-        dp = np.zeros_like(q)
-        
-        for i in range(len(q)):
-            q_plus = q.copy()
-            q_plus[i] += epsilon
-            q_minus = q.copy()
-            q_minus[i] -= epsilon
-            
-            H_plus = self.hamiltonian(q_plus, p)
-            H_minus = self.hamiltonian(q_minus, p)
-            
-            dp[i] = -(H_plus - H_minus) / (2 * epsilon)
-        
-        return dp
+        return _neg_grad_q(_as_vector(q), self.J_base, self.lambda_bio_cons)
     
     def compute_coherence(self, psi: np.ndarray) -> float:
         """
@@ -175,15 +201,9 @@ class BioenergticConsciousness:
         
         High coherence → faster integration → higher cognitive velocity.
         """
-        # Coherence = correlation strength
-        coherence = 0.0
-        count = 0
-        for i in range(4):
-            for j in range(i+1, 4):
-                coherence += abs(psi[i] * psi[j])
-                count += 1
-        
-        return coherence / (count + 1e-10)
+        # Coherence = correlation strength, averaged over the 6 pairs
+        count = 6
+        return _abs_pair_sum(psi[:4]) / (count + 1e-10)
     
     def compute_phi(self, psi: np.ndarray) -> float:
         """
@@ -193,13 +213,10 @@ class BioenergticConsciousness:
         High Φ = high consciousness.
         """
         # Coupling energy
-        coupling = 0.0
-        for i in range(4):
-            for j in range(i+1, 4):
-                coupling += abs(psi[i] * psi[j])
+        coupling = _abs_pair_sum(psi[:4])
         
         # Independent energy
-        independent = np.sum(psi**2)
+        independent = psi @ psi
         
         # Φ = ratio (dimensionless)
         phi = coupling / (independent + 1e-10)
@@ -244,36 +261,43 @@ class BioenergticConsciousness:
     
     def evolve_state(self, state: BioenergticState, dt: float = 0.01) -> BioenergticState:
         """
-        Evolve bioenergetic-consciousness state one timestep.
+        Evolve bioenergetic-consciousness state one leapfrog timestep.
         
         Uses Hamilton's equations:
         dq/dt = ∂H/∂p
         dp/dt = -∂H/∂q
         """
+        out = BioenergticState(psi=np.empty(4), pi=np.empty(4), E_bio=0.0,
+                               dopamine=0.0, coherence=0.0, phi=0.0)
+        return self._step_into(state, out, dt)
+    
+    def evolve_state_inplace(self, state: BioenergticState, dt: float = 0.01) -> BioenergticState:
+        """
+        evolve_state, writing into state's psi/pi arrays (float64) and
+        scalar fields instead of building a new state. Returns state.
+        """
+        return self._step_into(state, state, dt)
+    
+    def _step_into(self, state: BioenergticState, out: BioenergticState,
+                   dt: float) -> BioenergticState:
+        """One step from state, written into out (which may be state)"""
         # Current configuration and momentum
-        q = np.concatenate([state.psi, [state.E_bio]])
-        p = np.concatenate([state.pi, [0.0]])  # Energy momentum
+        q = _as_vector(np.concatenate([state.psi, [state.E_bio]]))
+        p = _as_vector(np.concatenate([state.pi, [0.0]]))  # Energy momentum
         
-        # Use dq_dt and dp_dt methods (Hamilton's equations)
-        dq = self.dq_dt(q, p)
-        dp = self.dp_dt(q, p)
+        # Hamilton's equations, analytic gradients, one compiled leapfrog step
+        q_new, p_new = _evolve_step(q, p, float(dt), self.J_base, self.lambda_bio_cons)
         
-        # Update
-        q_new = q + dq * dt
-        p_new = p + dp * dt
+        out.psi[:] = q_new[:4]
+        out.pi[:] = p_new[:4]
+        out.E_bio = max(0.0, min(100.0, q_new[4]))  # Clamp
+        out.dopamine = self.baseline_dopamine
         
         # Recompute derived quantities
-        coherence = self.compute_coherence(q_new[:4])
-        phi = self.compute_phi(q_new[:4])
-        
-        return BioenergticState(
-            psi=q_new[:4],
-            pi=p_new[:4],
-            E_bio=max(0.0, min(100.0, q_new[4])),  # Clamp
-            dopamine=self.baseline_dopamine,
-            coherence=coherence,
-            phi=phi
-        )
+        out.coherence = self.compute_coherence(out.psi)
+        out.phi = self.compute_phi(out.psi)
+        
+        return out
     
     def measure_tachyonic_access(self, state: BioenergticState) -> float:
         """
@@ -310,8 +334,8 @@ def create_initial_state(retention_days: float = 0.0) -> BioenergticState:
     pi = np.zeros(4)
     
     # Compute derived quantities
-    coherence = np.mean([abs(psi[i]*psi[j]) for i in range(4) for j in range(i+1, 4)])
-    phi = coherence / (np.sum(psi**2) + 1e-10)
+    coherence = _abs_pair_sum(psi) / 6
+    phi = coherence / (psi @ psi + 1e-10)
     
     dopamine = 1.0 + 0.1 * min(retention_days, 30.0)
     
@@ -18,6 +18,18 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from core import DissipativeHamiltonian
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in: the kernel runs as plain Python without numba"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 @dataclass
 class MarketState:
     """Phase-space point for market: (price, momentum)"""
@@ -28,6 +40,27 @@ class MarketState:
         return np.array([self.price, self.momentum])
 
 
+@njit(cache=True, fastmath=True)
+def _evolve_n(q, p, dt, n, lambda_liq, kappa, q_eq, damping, noise, external_flow):
+    """
+    n damped Langevin-Verlet ticks (same scheme as evolve_tick).
+    
+    noise holds the n pre-drawn half-step momentum kicks; returns the
+    (price, momentum) history after each tick.
+    """
+    q_hist = np.empty(n)
+    p_hist = np.empty(n)
+    F = -kappa * (q - q_eq)
+    for i in range(n):
+        p_half = p + 0.5 * dt * F + external_flow + noise[i]
+        q = q + dt * p_half / lambda_liq
+        F = -kappa * (q - q_eq)
+        p = (p_half + 0.5 * dt * F) * (1.0 - damping * dt)
+        q_hist[i] = q
+        p_hist[i] = p
+    return q_hist, p_hist
+
+
 class MarketHamiltonian(DissipativeHamiltonian):
     """
     Market dynamics as dissipative Hamiltonian system.
@@ -164,6 +197,29 @@ class MarketHamiltonian(DissipativeHamiltonian):
         # Note: noise already applied to p_half_noisy (affects q_new). p_new may be further modified by damping above.
 
         return MarketState(price=q_new, momentum=p_new)
+    
+    def evolve_n(
+        self,
+        price: float,
+        momentum: float,
+        dt: float = 1.0,
+        n: int = 1,
+        external_flow: float = 0.0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batched evolve_tick: n ticks in one compiled call.
+        
+        Noise is drawn up front from the same global RNG stream, so the
+        histories match n successive evolve_tick calls.
+        
+        Returns:
+            (price_history, momentum_history), each of length n
+        """
+        noise = np.random.normal(0, self.sigma * np.sqrt(dt), size=n)
+        gamma = getattr(self, 'damping', 0.0)
+        return _evolve_n(float(price), float(momentum), float(dt), int(n),
+                         float(self.lambda_liq), float(self.kappa), float(self.p_eq),
+                         float(gamma), noise, float(external_flow))
 
 
 class PolarsMarketSimulator:
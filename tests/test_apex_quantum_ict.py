@@ -47,3 +47,78 @@ def test_measure_regime_and_collapse_strategy():
 
     strategy = apex.collapse_strategy(state)
     assert 0 <= strategy < apex.n_strategies
+
+
+def test_state_arrays_share_one_buffer_and_copy_is_independent():
+    state = create_initial_apex_state(n_assets=4, n_strategies=3)
+
+    for name in ("prices", "orderflows", "predicted_prices", "meta_params", "strategy_amplitudes"):
+        assert np.shares_memory(getattr(state, name), state._buf)
+    assert state.strategy_amplitudes.dtype == np.complex128
+
+    clone = state.copy()
+    clone.prices += 1.0
+    clone.strategy_amplitudes[0] = 0.0
+    assert not np.shares_memory(clone._buf, state._buf)
+    assert not np.allclose(clone.prices, state.prices)
+
+    # A reassigned field is repacked on the next copy
+    state.prices = np.zeros(4)
+    np.testing.assert_array_equal(state.copy().prices, np.zeros(4))
+
+
+def test_evolve_trajectory_matches_stepwise_evolution():
+    apex = ApexQuantumICT(n_assets=4, n_strategies=3)
+    state = create_initial_apex_state(n_assets=4, n_strategies=3)
+
+    stepped = state
+    for _ in range(20):
+        stepped = apex.evolve_state(stepped, dt=0.05)
+
+    final, history = apex.evolve_trajectory(state, dt=0.05, n_steps=20)
+
+    assert history["prices"].shape == (21, 4)
+    np.testing.assert_allclose(history["prices"][0], state.prices)
+    np.testing.assert_allclose(final.prices, stepped.prices)
+    np.testing.assert_allclose(final.orderflows, stepped.orderflows)
+    np.testing.assert_allclose(final.predicted_prices, stepped.predicted_prices)
+    np.testing.assert_allclose(final.strategy_amplitudes, stepped.strategy_amplitudes, atol=1e-12)
+
+
+def test_evolve_state_inplace_matches_evolve_state():
+    apex = ApexQuantumICT(n_assets=4, n_strategies=3)
+    state = create_initial_apex_state(n_assets=4, n_strategies=3)
+
+    expected = apex.evolve_state(state, dt=0.05)
+    prices = state.prices
+    result = apex.evolve_state_inplace(state, dt=0.05)
+
+    assert result is state
+    assert state.prices is prices
+    np.testing.assert_array_equal(state.prices, expected.prices)
+    np.testing.assert_array_equal(state.orderflows, expected.orderflows)
+    np.testing.assert_array_equal(state.predicted_prices, expected.predicted_prices)
+    np.testing.assert_array_equal(state.strategy_amplitudes, expected.strategy_amplitudes)
+
+
+def test_h_market_nan_and_empty_prices():
+    apex = ApexQuantumICT(n_assets=2, n_strategies=3)
+    state = create_initial_apex_state(n_assets=2, n_strategies=3)
+    state.orderflows = np.zeros(2)
+
+    # NaN prices poison the means but not the CRASH barrier (any P < 50)
+    state.prices = np.array([np.nan, 40.0])
+    state.regime = MarketRegime.CRASH
+    assert apex.H_market(state) == 1000.0
+    state.prices = np.array([np.nan, 120.0])
+    assert apex.H_market(state) == 0.0
+    for regime in (MarketRegime.BULL, MarketRegime.RANGE):
+        state.regime = regime
+        assert np.isnan(apex.H_market(state))
+
+    state.prices = np.zeros(0)
+    state.orderflows = np.zeros(0)
+    state.regime = MarketRegime.CRASH
+    assert apex.H_market(state) == 0.0
+    state.regime = MarketRegime.BEAR
+    assert np.isnan(apex.H_market(state))
@@ -98,6 +98,29 @@ class TestConservationLaws:
         # Volume should be roughly preserved (within numerical error)
         # This is a simplified test - full test would compute actual volume
         assert len(evolved_q) > 0
+    
+    def test_non_compilable_potential_falls_back(self):
+        """Potentials outside the numba/NumPy printers use the Python methods"""
+        import sympy as sp
+        
+        @define_system
+        class Bessel:
+            coordinates = ['x']
+            
+            def kinetic(self, p):
+                return p.px**2 / 2
+            
+            def potential(self, q):
+                return -sp.besselj(0, q.x)
+        
+        system = Bessel()
+        q, p = np.array([1.0]), np.array([0.5])
+        expected = 0.125 - float(sp.besselj(0, 1.0))
+        assert float(system.hamiltonian(q, p)) == pytest.approx(expected)
+        
+        initial = PhaseSpace(q=q, p=p)
+        t, q_traj, p_traj = system.evolve(initial, t_max=0.1, dt=0.01)
+        assert np.all(np.isfinite(q_traj.astype(float)))
 
 
 class TestSymbolicEngine:
@@ -135,6 +158,16 @@ class TestSymbolicEngine:
         # Energy should always be conserved
         assert 'energy' in conserved
         assert conserved['energy'] == sh.H
+    
+    def test_linearization_block_structure(self):
+        """Separable H linearizes to [[0, T_pp], [-V_qq, 0]]"""
+        sh = harmonic_oscillator_hamiltonian(n_dof=2, k=2.0, m=1.0)
+        
+        J = np.array(sh.linearize_around_equilibrium([0.0, 0.0], [0.0, 0.0]), dtype=float)
+        
+        expected = np.block([[np.zeros((2, 2)), np.eye(2)],
+                             [-2.0 * np.eye(2), np.zeros((2, 2))]])
+        np.testing.assert_allclose(J, expected)
 
 
 class TestDomains:
@@ -291,6 +291,54 @@ class TestCrossDomainCoupling:
         # Energy should be conserved (within numerical error)
         relative_error = abs(E_final - E_initial) / abs(E_initial)
         assert relative_error < 0.01  # 1% tolerance
+    
+    def test_vectorized_coupling_force_matches_scalar(self):
+        """Batched coupling gradient agrees with the per-coordinate loop"""
+        from core.cross_domain_coupling import CoupledSystem
+        
+        def scalar(s1, s2):
+            return s1.q[0] * s2.q[0] + s1.q[1]**2 * s2.q[1]
+        
+        def batched(s1, s2):
+            return s1.q[:, 0] * s2.q[0] + s1.q[:, 1]**2 * s2.q[1]
+        batched.vectorized = True
+        
+        state1 = PhaseSpace(q=np.array([1.0, -0.5]), p=np.zeros(2))
+        state2 = PhaseSpace(q=np.array([0.3, 2.0]), p=np.zeros(2))
+        strengths = np.array([[0, 0.1], [0.1, 0]])
+        
+        forces = []
+        for func in (scalar, batched):
+            coupled = CoupledSystem(
+                subsystems=[None, None],
+                coupling_strengths=strengths,
+                coupling_functions=[[None, func], [None, None]]
+            )
+            forces.append(coupled._compute_coupling_force(0, 1, state1, state2))
+        
+        np.testing.assert_allclose(forces[0], forces[1], rtol=1e-6)
+        np.testing.assert_allclose(forces[0], [-0.03, 0.2], rtol=1e-6)
+        np.testing.assert_array_equal(state1.q, [1.0, -0.5])
+    
+    def test_symbolic_coupling_gradient(self):
+        """Registered SymPy couplings give the exact gradient and energy"""
+        import sympy as sp
+        from core.cross_domain_coupling import CoupledSystem
+        
+        x1, x2, y1, y2 = sp.symbols('x1 x2 y1 y2')
+        coupled = CoupledSystem(
+            subsystems=[None, None],
+            coupling_strengths=np.array([[0, 0.1], [0.1, 0]]),
+            coupling_functions=[[None, None], [None, None]]
+        )
+        coupled.register_symbolic_coupling(0, 1, x1*y1 + x2**2*y2, [x1, x2], [y1, y2])
+        
+        state1 = PhaseSpace(q=np.array([1.0, -0.5]), p=np.zeros(2))
+        state2 = PhaseSpace(q=np.array([0.3, 2.0]), p=np.zeros(2))
+        
+        force = coupled._compute_coupling_force(0, 1, state1, state2)
+        np.testing.assert_allclose(force, [-0.03, 0.2])
+        assert coupled.total_hamiltonian([state1, state2]) == pytest.approx(0.1 * 0.8)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,29 @@
+"""
+MarketStateTable tests for the quantum trading experiment.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "experiments" / "markets" / "quantum_trading"))
+
+from hamiltonian.engine import MARKET_DTYPE, HamiltonianEngine, MarketStateTable
+
+
+def test_table_timestamp_round_trip_in_seconds():
+    ts_ns = 1_760_000_000_123_456_789
+    data = np.zeros(2, dtype=MARKET_DTYPE)
+    data[0] = (100.0, 0.1, 0.2, 0.01, 1e6, ts_ns)
+    table = MarketStateTable(['AAA', 'BBB'], data, np.array([True, False]))
+
+    state = table['AAA']
+    assert 'BBB' not in table
+    assert isinstance(state.timestamp, float)
+    assert state.timestamp == pytest.approx(ts_ns / 1e9, abs=1e-6)
+
+    # evolve advances the timestamp by dt seconds
+    evolved = HamiltonianEngine().evolve(state, dt=0.5)
+    assert evolved.timestamp == pytest.approx(state.timestamp + 0.5, abs=1e-6)